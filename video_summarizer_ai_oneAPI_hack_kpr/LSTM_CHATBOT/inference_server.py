@@ -0,0 +1,193 @@
+# inference_server.py
+# Micro-batching inference for the LSTM intent model. Concurrent requests are
+# queued and a single worker thread runs them through the model together:
+# a batch is sent as soon as it is full or when the oldest request has waited
+# max_wait_ms. Models trained with --mask-zero (see lstm_model.py) get each
+# batch padded only to its longest message; others are padded to max_length.
+#
+# In process:  server = IntentServer(model, tokenizer); server.predict("hello")
+# Over HTTP:   python inference_server.py --port 8766
+#              curl -d '{"texts": ["hello", "goodbye"]}' http://127.0.0.1:8766/predict
+import argparse
+import json
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+DEFAULT_MAX_BATCH_SIZE = 32
+DEFAULT_MAX_WAIT_MS = 5.0
+
+
+class MicroBatcher:
+    # Groups items submitted from many threads into calls of batch_fn(items) -> results
+    def __init__(self, batch_fn, max_batch_size=DEFAULT_MAX_BATCH_SIZE, max_wait_ms=DEFAULT_MAX_WAIT_MS):
+        self.batch_fn = batch_fn
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000.0
+        self.stats = {"requests": 0, "batches": 0, "max_batch": 0}
+        self._queue = queue.Queue()
+        self._closed = False
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    # Function to queue one item, returning a Future for its result
+    def submit(self, item):
+        if self._closed:
+            raise RuntimeError("MicroBatcher is closed")
+        future = Future()
+        self._queue.put((item, future))
+        return future
+
+    def __call__(self, item, timeout=None):
+        return self.submit(item).result(timeout)
+
+    def _collect(self):
+        first = self._queue.get()
+        if first is None:
+            return None
+        batch = [first]
+        deadline = time.monotonic() + self.max_wait
+        while len(batch) < self.max_batch_size:
+            remaining = deadline - time.monotonic()
+            try:
+                entry = self._queue.get(timeout=remaining) if remaining > 0 else self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if entry is None:
+                # Close requested: finish this batch, then stop
+                self._queue.put(None)
+                break
+            batch.append(entry)
+        return batch
+
+    def _run(self):
+        while True:
+            batch = self._collect()
+            if batch is None:
+                return
+            items = [item for item, _ in batch]
+            self.stats["requests"] += len(batch)
+            self.stats["batches"] += 1
+            self.stats["max_batch"] = max(self.stats["max_batch"], len(batch))
+            try:
+                results = self.batch_fn(items)
+            except Exception as e:
+                for _, future in batch:
+                    future.set_exception(e)
+                continue
+            for (_, future), result in zip(batch, results):
+                future.set_result(result)
+
+    def close(self):
+        self._closed = True
+        self._queue.put(None)
+        self._thread.join()
+
+
+class IntentServer:
+    # Conversation-intent scores (0..1) from the LSTM model, micro-batched
+    def __init__(self, model, tokenizer, max_batch_size=DEFAULT_MAX_BATCH_SIZE, max_wait_ms=DEFAULT_MAX_WAIT_MS,
+                 meta=None):
+        from lstm_model import uses_masking
+        self.model = model
+        self.tokenizer = tokenizer
+        # Only a masked model gives the same scores whatever the padding length
+        self.dynamic_padding = uses_masking(meta or {})
+        self.batcher = MicroBatcher(self._predict_batch, max_batch_size, max_wait_ms)
+
+    def _predict_batch(self, texts):
+        from lstm_model import encode
+        if self.dynamic_padding:
+            inputs = encode(self.tokenizer, texts, maxlen=None, padding='post')
+        else:
+            inputs = encode(self.tokenizer, texts)
+        # Calling the model directly skips predict()'s per-call dataset setup, which dominates small batches
+        scores = self.model(inputs, training=False)
+        return [float(score) for score in scores.numpy()[:, 0]]
+
+    # Function to score one message
+    def predict(self, text, timeout=None):
+        return self.batcher(text, timeout)
+
+    # Function to score several messages (they join whatever batch is forming)
+    def predict_many(self, texts, timeout=None):
+        futures = [self.batcher.submit(text) for text in texts]
+        return [future.result(timeout) for future in futures]
+
+    def close(self):
+        self.batcher.close()
+
+
+class IntentRequestHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True
+    server_model = None
+
+    def log_message(self, format, *args):
+        pass
+
+    def _send_json(self, status, payload):
+        body = json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        if self.path == "/stats":
+            self._send_json(200, self.server_model.batcher.stats)
+        else:
+            self._send_json(404, {"error": "not found"})
+
+    def do_POST(self):
+        if self.path != "/predict":
+            self._send_json(404, {"error": "not found"})
+            return
+        length = int(self.headers.get("Content-Length", 0))
+        try:
+            request = json.loads(self.rfile.read(length) or b"{}")
+        except json.JSONDecodeError:
+            self._send_json(400, {"error": "invalid JSON"})
+            return
+        texts = request.get("texts")
+        if texts is None:
+            texts = [request.get("text", "")]
+        self._send_json(200, {"scores": self.server_model.predict_many(texts)})
+
+
+class IntentHTTPServer(ThreadingHTTPServer):
+    daemon_threads = True
+    # socketserver's default listen backlog of 5 resets connections under a burst of clients
+    request_queue_size = 128
+
+
+# Function to serve an IntentServer over HTTP in a background thread, returning (http_server, url)
+def start_http_server(intent_server, host="127.0.0.1", port=0):
+    handler = type("ConfiguredIntentRequestHandler", (IntentRequestHandler,), {"server_model": intent_server})
+    server = IntentHTTPServer((host, port), handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://{host}:{server.server_address[1]}/predict"
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Micro-batching HTTP server for the LSTM intent model")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8766)
+    parser.add_argument("--max-batch-size", type=int, default=DEFAULT_MAX_BATCH_SIZE)
+    parser.add_argument("--max-wait-ms", type=float, default=DEFAULT_MAX_WAIT_MS)
+    args = parser.parse_args()
+
+    from lstm_model import load_artifacts
+    model, tokenizer, meta = load_artifacts()
+    intent_server = IntentServer(model, tokenizer, args.max_batch_size, args.max_wait_ms, meta=meta)
+    http_server, url = start_http_server(intent_server, args.host, args.port)
+    print(f"LSTM intent model serving on {url}")
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        http_server.shutdown()
+        intent_server.close()
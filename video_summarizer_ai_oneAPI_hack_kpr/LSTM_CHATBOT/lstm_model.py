@@ -0,0 +1,131 @@
+# lstm_model.py
+# Model definition, training and artifact loading for the LSTM chatbot.
+# Training runs once through train.py and saves the Keras model, the fitted
+# tokenizer and a small metadata file under artifacts/; the Streamlit app
+# only loads them.
+#
+# By default the model matches the original chatbot: inputs pre-padded to
+# max_length. Training with --mask-zero instead builds a masked Embedding over
+# post-padded inputs, so the inference server can pad each batch only to its
+# longest message. meta.json records which one a model was trained with;
+# existing artifacts have to be retrained (python train.py --mask-zero) to
+# switch.
+import json
+import os
+import time
+
+import numpy as np
+import pandas as pd
+from tensorflow import keras
+from tensorflow.keras.layers import LSTM, Dense, Embedding
+from tensorflow.keras.models import Sequential
+from tensorflow.keras.preprocessing.sequence import pad_sequences
+from tensorflow.keras.preprocessing.text import Tokenizer, tokenizer_from_json
+
+MODULE_DIR = os.path.dirname(os.path.abspath(__file__))
+DATASET_PATH = os.path.join(MODULE_DIR, "chatbot_dataset.csv")
+ARTIFACT_DIR = os.environ.get("LSTM_ARTIFACT_DIR", os.path.join(MODULE_DIR, "artifacts"))
+MODEL_FILE = "model.keras"
+TOKENIZER_FILE = "tokenizer.json"
+META_FILE = "meta.json"
+
+# Define the maximum sequence length and vocabulary size
+max_length = 100
+num_words = 10000
+SEED = 42
+
+
+# Function to define the LSTM model architecture
+def build_model(mask_zero=False):
+    model = Sequential()
+    if mask_zero:
+        # Padding steps are masked out, so sequences can be any length
+        model.add(Embedding(input_dim=num_words, output_dim=128, mask_zero=True))
+    else:
+        model.add(Embedding(input_dim=num_words, output_dim=128, input_length=max_length))
+    model.add(LSTM(128, dropout=0.2))
+    model.add(Dense(64, activation='relu'))
+    model.add(Dense(1, activation='sigmoid'))
+    model.compile(loss='binary_crossentropy', optimizer='adam', metrics=['accuracy'])
+    return model
+
+
+# Function to turn texts into padded id sequences; maxlen=None pads to the longest text
+def encode(tokenizer, texts, maxlen=max_length, padding='pre'):
+    sequences = tokenizer.texts_to_sequences(texts)
+    if maxlen is None:
+        # At least one step so an all-unknown message still produces a valid input
+        maxlen = max(1, min(max_length, max((len(seq) for seq in sequences), default=1)))
+    return pad_sequences(sequences, maxlen=maxlen, padding=padding, truncating=padding)
+
+
+# Function to tell whether a saved model was trained with masking (and so accepts any input length)
+def uses_masking(meta):
+    return bool(meta.get("mask_zero", False))
+
+
+# Function to fit the tokenizer and train the model on the dataset, then save the artifacts
+def train(dataset_path=DATASET_PATH, artifact_dir=ARTIFACT_DIR, epochs=10, batch_size=32, verbose=1,
+          mask_zero=False):
+    start = time.perf_counter()
+    # Fixed seeds so retraining on the same data gives the same model
+    keras.utils.set_random_seed(SEED)
+
+    df = pd.read_csv(dataset_path)
+    training_texts = df['input'].tolist()
+    training_labels = [1] * len(training_texts)  # Assuming all inputs are for conversation
+
+    tokenizer = Tokenizer(num_words=num_words)
+    tokenizer.fit_on_texts(training_texts)
+
+    # Masked models are post-padded so the real tokens always start at step 0
+    padding = 'post' if mask_zero else 'pre'
+    padded_inputs = encode(tokenizer, training_texts, padding=padding)
+    outputs = np.array(training_labels)
+
+    # Sample validation data (replace with your actual validation data)
+    validation_texts = ["hi there", "see you later"]
+    validation_labels = [1, 0]
+    padded_inputs_val = encode(tokenizer, validation_texts, padding=padding)
+    outputs_val = np.array(validation_labels)
+
+    model = build_model(mask_zero)
+    model.fit(padded_inputs, outputs, epochs=epochs, batch_size=batch_size,
+              validation_data=(padded_inputs_val, outputs_val), verbose=verbose)
+
+    os.makedirs(artifact_dir, exist_ok=True)
+    model.save(os.path.join(artifact_dir, MODEL_FILE))
+    with open(os.path.join(artifact_dir, TOKENIZER_FILE), "w", encoding="utf-8") as f:
+        f.write(tokenizer.to_json())
+    meta = {
+        "max_length": max_length,
+        "num_words": num_words,
+        "mask_zero": mask_zero,
+        "padding": padding,
+        "epochs": epochs,
+        "training_rows": len(training_texts),
+        "dataset": os.path.basename(dataset_path),
+        "train_seconds": round(time.perf_counter() - start, 2),
+        "trained_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+    }
+    with open(os.path.join(artifact_dir, META_FILE), "w", encoding="utf-8") as f:
+        json.dump(meta, f, indent=2)
+    return model, tokenizer, meta
+
+
+# Function to check whether trained artifacts exist
+def has_artifacts(artifact_dir=ARTIFACT_DIR):
+    return all(os.path.exists(os.path.join(artifact_dir, name)) for name in (MODEL_FILE, TOKENIZER_FILE))
+
+
+# Function to load the saved model and tokenizer; returns (model, tokenizer, meta)
+def load_artifacts(artifact_dir=ARTIFACT_DIR):
+    model = keras.models.load_model(os.path.join(artifact_dir, MODEL_FILE))
+    with open(os.path.join(artifact_dir, TOKENIZER_FILE), encoding="utf-8") as f:
+        tokenizer = tokenizer_from_json(f.read())
+    meta = {}
+    meta_path = os.path.join(artifact_dir, META_FILE)
+    if os.path.exists(meta_path):
+        with open(meta_path, encoding="utf-8") as f:
+            meta = json.load(f)
+    return model, tokenizer, meta
@@ -0,0 +1,99 @@
+# response_index.py
+# Lookup of canned replies for the LSTM chatbot. Built once from the dataset:
+# normalized inputs map straight to their response for O(1) exact hits, and a
+# character-trigram inverted index finds the closest input for messages with
+# typos or extra words. Trigrams shared by a large fraction of the inputs are
+# left out of candidate generation, so lookups stay fast on datasets with
+# hundreds of thousands of rows.
+import csv
+import re
+from collections import Counter, namedtuple
+
+DEFAULT_THRESHOLD = 0.5
+# Trigrams in more than this fraction of the inputs don't pick candidates (unless nothing else does)
+MAX_POSTING_FRACTION = 0.05
+
+_WORD_RE = re.compile(r"\w+")
+
+# What lookup returns: the reply, the dataset input it came from and a 0..1 similarity
+ResponseMatch = namedtuple("ResponseMatch", ["response", "input", "score"])
+
+
+# Function to normalize a message: lowercase words without punctuation
+def normalize(text):
+    return " ".join(_WORD_RE.findall(str(text).lower()))
+
+
+# Function to get the set of character trigrams of a normalized message
+def trigrams(normalized):
+    padded = f" {normalized} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+class ResponseIndex:
+    def __init__(self, inputs, responses, threshold=DEFAULT_THRESHOLD):
+        self.threshold = threshold
+        self._exact = {}
+        self._inputs = []
+        self._responses = []
+        self._sizes = []
+        self._postings = {}
+        for text, response in zip(inputs, responses):
+            key = normalize(text)
+            # The first row for an input wins, as with the old DataFrame lookup
+            if not key or key in self._exact:
+                continue
+            self._exact[key] = response
+            row = len(self._inputs)
+            grams = trigrams(key)
+            self._inputs.append(text)
+            self._responses.append(response)
+            self._sizes.append(len(grams))
+            for gram in grams:
+                self._postings.setdefault(gram, []).append(row)
+
+    @classmethod
+    def from_csv(cls, path, threshold=DEFAULT_THRESHOLD):
+        with open(path, encoding="utf-8", newline="") as f:
+            rows = list(csv.DictReader(f))
+        return cls([row["input"] for row in rows], [row["response"] for row in rows], threshold)
+
+    def __len__(self):
+        return len(self._inputs)
+
+    # Function to get the reply for an exact (normalized) input, or None
+    def exact(self, text):
+        return self._exact.get(normalize(text))
+
+    # Function to find the reply for a message: exact match first, then the most similar input
+    # by trigram Jaccard similarity if it reaches the threshold; None otherwise
+    def lookup(self, text):
+        key = normalize(text)
+        if not key:
+            return None
+        response = self._exact.get(key)
+        if response is not None:
+            return ResponseMatch(response, key, 1.0)
+
+        grams = trigrams(key)
+        limit = max(1, int(len(self._inputs) * MAX_POSTING_FRACTION))
+        selective = [gram for gram in grams if 0 < len(self._postings.get(gram, ())) <= limit]
+        if not selective:
+            selective = [gram for gram in grams if gram in self._postings]
+        shared = Counter()
+        for gram in selective:
+            shared.update(self._postings[gram])
+        if not shared:
+            return None
+
+        best_row, best_score = None, 0.0
+        for row, _ in shared.most_common(50):
+            # Rescore the top candidates on all trigrams, not just the selective ones
+            candidate = trigrams(normalize(self._inputs[row]))
+            overlap = len(grams & candidate)
+            score = overlap / (len(grams) + self._sizes[row] - overlap)
+            if score > best_score:
+                best_row, best_score = row, score
+        if best_score < self.threshold:
+            return None
+        return ResponseMatch(self._responses[best_row], self._inputs[best_row], round(best_score, 3))
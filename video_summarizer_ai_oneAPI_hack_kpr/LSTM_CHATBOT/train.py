@@ -0,0 +1,21 @@
+# train.py
+# Train the LSTM chatbot model and save it with its tokenizer for chatbot.py.
+#
+# Usage: python train.py [--dataset chatbot_dataset.csv] [--epochs 10] [--output artifacts] [--mask-zero]
+import argparse
+
+from lstm_model import ARTIFACT_DIR, DATASET_PATH, train
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Train the LSTM chatbot and save the model artifacts")
+    parser.add_argument("--dataset", default=DATASET_PATH)
+    parser.add_argument("--epochs", type=int, default=10)
+    parser.add_argument("--batch-size", type=int, default=32)
+    parser.add_argument("--output", default=ARTIFACT_DIR, help="directory for the model and tokenizer")
+    parser.add_argument("--mask-zero", action="store_true",
+                        help="mask padding so inference can pad each batch only to its longest message")
+    args = parser.parse_args()
+
+    model, tokenizer, meta = train(args.dataset, args.output, args.epochs, args.batch_size,
+                                  mask_zero=args.mask_zero)
+    print(f"Trained on {meta['training_rows']} rows in {meta['train_seconds']}s; artifacts saved to {args.output}")
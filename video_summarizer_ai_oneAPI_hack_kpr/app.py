@@ -214,24 +214,26 @@
 #             if st.button("Listen to Translated Text"):
 #                 speak_text(translated_text)
 
-import http.client
+from app_cache import cached_translation, fetch_transcript, get_cached_chat_client, get_cached_user_store, get_tts_engine
+from chapters import add_chapters_to_pdf, cached_chapters, chapters_markdown
+from chat_cache import chat_cache
+from chat_client import ChatAPIError
+from moderation import check_message
+import time
 import streamlit as st
-from youtube_transcript_api import YouTubeTranscriptApi
-from transformers import pipeline
+from job_queue import QueueFull, get_job, queue_stats, start_worker, submit_job
 from fpdf import FPDF
-from googletrans import Translator
+from translation import translation_cache
+from user_store import UserStoreBusy
 import json
-import pyttsx3
 from PIL import Image
 import pytesseract
-import mysql.connector
 
 # Set Tesseract path
 pytesseract.pytesseract.tesseract_cmd = r'C:\Program Files\Tesseract-OCR\tesseract.exe'
 
-# Set up the translator and text-to-speech engine
-translator = Translator()
-tts_engine = pyttsx3.init()
+# Summaries run in a background worker process (it loads and keeps the model warm)
+start_worker()
 
 # Initialize session state variables
 if "logged_in" not in st.session_state:
@@ -239,16 +241,6 @@ if "logged_in" not in st.session_state:
 if "username" not in st.session_state:
     st.session_state["username"] = ""
 
-# Violations list with keywords, descriptions, and risk levels
-violations = [
-    {"keywords": ["harm", "hurt", "kill", "abuse", "violence"], "description": "Harmful content", "risk_level": 5},
-    {"keywords": ["age", "disability", "manipulate", "exploit"], "description": "Exploiting vulnerabilities (age, disability)", "risk_level": 4},
-    {"keywords": ["subliminal", "manipulative"], "description": "Subliminal techniques to impair decision-making", "risk_level": 3},
-    {"keywords": ["threat", "intimidation"], "description": "Threatening behavior", "risk_level": 4},
-    {"keywords": ["racism", "sexism", "discrimination"], "description": "Discriminatory language", "risk_level": 4},
-    {"keywords": ["assault", "harassment", "abduction"], "description": "Harassment or assault", "risk_level": 5},
-]
-
 # Function to extract video ID from link
 def extract_video_id(link):
     try:
@@ -260,60 +252,67 @@ def extract_video_id(link):
         print(f"Error extracting video ID: {str(e)}")
         return None
 
-# Function to get ChatGPT response
-def get_chatgpt_response(message):
-    conn = http.client.HTTPSConnection("open-ai21.p.rapidapi.com")
-    payload = json.dumps({
-        "messages": [{"role": "user", "content": message}],
-        "web_access": False,
-        "system_prompt": "You are a helpful AI assistant.",
-        "temperature": 0.7,
-        "max_tokens": 1000
-    })
-    headers = {
-        'x-rapidapi-key': "b3f00fe5cemshc7eaab2ade19a85p12e03bjsnc5a15b5ce04b",
-        'x-rapidapi-host': "open-ai21.p.rapidapi.com",
-        'Content-Type': "application/json"
-    }
-    conn.request("POST", "/claude3", payload, headers)
-    res = conn.getresponse()
-    data = res.read()
-    return data.decode("utf-8")
-
-# Function to translate text
-def translate_text(text, lang):
-    result = translator.translate(text, dest=lang)
-    return result.text
+# Function to stream ChatGPT response text as it arrives (pooled keep-alive client with retries, see
+# chat_client.py; falls back to one piece if the backend doesn't stream)
+def stream_chatgpt_response(message):
+    return get_cached_chat_client().stream(
+        message,
+        system_prompt="You are a helpful AI assistant.",
+        temperature=0.7,
+        max_tokens=1000
+    )
+
+# Function to convert markdown-style lists in a bot response to HTML lists
+def format_bot_response(bot_response):
+    if '\n-' not in bot_response:
+        return bot_response
+    # Split the response into parts
+    parts = bot_response.split('\n-')
+    main_text = parts[0]
+    list_items = parts[1:]
+
+    # Format as HTML
+    formatted_response = f"{main_text}<ul style='color: #000000; margin: 10px 0; padding-left: 20px;'>"
+    for item in list_items:
+        formatted_response += f"<li style='color: #000000; margin: 5px 0;'>{item.strip()}</li>"
+    formatted_response += "</ul>"
+    return formatted_response
+
+# Function to build the assistant chat bubble
+def bot_bubble(content):
+    return f"""
+    <div style="display: flex; justify-content: flex-start; margin-bottom: 10px;">
+        <div style="background-color: #f0f0f0; padding: 10px; border-radius: 15px; max-width: 70%;">
+            <div style="margin: 0; color: #000000;">
+                <strong style="color: #000000;">Assistant:</strong> {content}
+            </div>
+        </div>
+    </div>
+    """
 
 # Function to generate PDF
-def generate_pdf(summary_text):
+def generate_pdf(summary_text, chapters=None, video_id=None):
     pdf = FPDF()
     pdf.add_page()
     pdf.set_font("Arial", size=12)
     pdf.cell(200, 10, txt="YouTube Video Summary", ln=True, align="C")
     pdf.multi_cell(0, 10, summary_text)
+    if chapters and video_id:
+        add_chapters_to_pdf(pdf, video_id, chapters)
     pdf_file = "summary.pdf"
     pdf.output(pdf_file)
     return pdf_file
 
 # Function to speak text
 def speak_text(text):
+    tts_engine = get_tts_engine()
     tts_engine.setProperty('rate', 150)  # Speed of speech
     tts_engine.say(text)
     tts_engine.runAndWait()
 
-# Function to chunk text into smaller pieces
-def chunk_text(text, max_length=1024):
-    words = text.split()
-    for i in range(0, len(words), max_length):
-        yield ' '.join(words[i:i+max_length])
-
-# Function to check for violations in a message
+# Function to check for violations in a message; returns every matching category, highest risk first
 def check_for_violations(message):
-    for violation in violations:
-        if any(keyword in message.lower() for keyword in violation["keywords"]):
-            return violation
-    return None
+    return check_message(message)
 
 # Function to convert image to text
 def image_to_text(image):
@@ -334,36 +333,26 @@ languages = {
     'Hindi': 'hi',
 }
 
-# Set up database connection
-db = mysql.connector.connect(
-    host="localhost",
-    user="root",
-    password="",
-    database="test"
-)
-
-# Create table users if it doesn't exist
-cursor = db.cursor()
-cursor.execute("""
-    CREATE TABLE IF NOT EXISTS users (
-        id INT AUTO_INCREMENT PRIMARY KEY,
-        username VARCHAR(50) NOT NULL,
-        password VARCHAR(255) NOT NULL
-    )
-""")
-db.commit()
-
-# Function to register a new user
+# Function to register a new user (pooled connections and hashed passwords, see user_store.py)
 def register_user(username, password):
-    cursor.execute("INSERT INTO users (username, password) VALUES (%s, %s)", (username, password))
-    db.commit()
-    return True
+    return get_cached_user_store().register_user(username, password)
 
 # Function to login a user
 def login_user(username, password):
-    cursor.execute("SELECT * FROM users WHERE username = %s AND password = %s", (username, password))
-    user = cursor.fetchone()
-    return user is not None
+    return get_cached_user_store().login_user(username, password)
+
+# Function to get the summarization job for a video, submitting one if this session has none
+# or its last one failed. The job ID is also put in the URL so a browser refresh picks the same job back up.
+def get_summary_job(video_id):
+    jobs = st.session_state.setdefault("summary_jobs", {})
+    job_id = jobs.get(video_id)
+    job = get_job(job_id) if job_id else None
+    # A failed job (e.g. a transient transcript fetch error) is retried instead of being shown again
+    if job is None or job["status"] == "failed":
+        job_id = submit_job(video_id)
+        jobs[video_id] = job_id
+    st.experimental_set_query_params(job=job_id)
+    return job_id
 
 # Set up Streamlit app
 st.title("Video Summarizer.ai & Chatbot")
@@ -388,13 +377,17 @@ if option == "Login":
     login_username = st.text_input("Username")
     login_password = st.text_input("Password", type="password")
     if st.button("Login"):
-        if login_user(login_username, login_password):
-            st.session_state["logged_in"] = True
-            st.session_state["username"] = login_username
-            st.success(f"Login successful! Welcome, {login_username}")
-            st.experimental_rerun()  # Rerun the app to show the chatbot
-        else:
-            st.error("Invalid username or password.")
+        try:
+            if login_user(login_username, login_password):
+                st.session_state["logged_in"] = True
+                st.session_state["username"] = login_username
+                st.success(f"Login successful! Welcome, {login_username}")
+                st.experimental_rerun()  # Rerun the app to show the chatbot
+            else:
+                st.error("Invalid username or password.")
+        except UserStoreBusy as e:
+            print(f"Error logging in: {str(e)}")
+            st.error("Login is busy right now. Please try again in a moment.")
 
 # Separate page for registration
 elif option == "Register":
@@ -402,10 +395,14 @@ elif option == "Register":
     register_username = st.text_input("Username")
     register_password = st.text_input("Password", type="password")
     if st.button("Register"):
-        if register_user(register_username, register_password):
-            st.success("Registration successful!")
-        else:
-            st.error("Error registering user.")
+        try:
+            if register_user(register_username, register_password):
+                st.success("Registration successful!")
+            else:
+                st.error("Error registering user.")
+        except UserStoreBusy as e:
+            print(f"Error registering user: {str(e)}")
+            st.error("Registration is busy right now. Please try again in a moment.")
 
 # Protected content for YouTube summarizer and chatbot
 elif option == "YouTube Summarizer" or option == "Chatbot":
@@ -416,23 +413,64 @@ elif option == "YouTube Summarizer" or option == "Chatbot":
         if option == "YouTube Summarizer":
             st.write("Welcome to the YouTube Summarizer feature.")
             youtube_link = st.text_input("Enter YouTube link")
+            job_id = None
             if youtube_link:
                 video_id = extract_video_id(youtube_link)
                 if video_id:
                     try:
-                        # Get video transcript
-                        transcript = YouTubeTranscriptApi.get_transcript(video_id)
-                        transcript_text = ' '.join([t['text'] for t in transcript])
-                        summarizer = pipeline("summarization")
-                        chunked_texts = list(chunk_text(transcript_text, max_length=400))
-                        summaries = [summarizer(chunk, max_length=150, min_length=50, do_sample=False)[0]['summary_text'] for chunk in chunked_texts]
-                        full_summary = ' '.join(summaries)
+                        job_id = get_summary_job(video_id)
+                    except QueueFull:
+                        st.warning("The summarizer is busy right now. Please try again in a few minutes.")
+                else:
+                    st.warning("Please enter a valid video link.")
+            else:
+                # Resume a job after a browser refresh, retrying it if it had failed
+                job_id = st.experimental_get_query_params().get("job", [None])[0]
+                resumed = get_job(job_id) if job_id else None
+                if resumed is not None and resumed["status"] == "failed":
+                    try:
+                        job_id = get_summary_job(resumed["video_id"])
+                    except QueueFull:
+                        st.warning("The summarizer is busy right now. Please try again in a few minutes.")
+
+            job = get_job(job_id) if job_id else None
+            if job is not None:
+                st.write("Summary of the video:")
+                if job["status"] in ("queued", "running"):
+                    # Show partial summaries as the worker reports them and poll again
+                    st.progress(min(1.0, job["progress"]))
+                    if job["partial"]:
+                        st.write(job["partial"])
+                    else:
+                        st.write("Waiting for the summarizer..." if job["status"] == "queued" else "Summarizing...")
+                    time.sleep(1)
+                    st.experimental_rerun()
+                elif job["status"] == "failed":
+                    st.error("Error summarizing video. Please check the video link and try again.")
+                else:
+                    full_summary = job["result"] or ""
+                    st.write(full_summary)
+                    if job["stats"].get("reused"):
+                        st.caption(f"Reused {job['stats']['reused']} of {job['stats']['chunks']} chunk summaries from earlier videos.")
 
-                        st.write("Summary of the video:")
-                        st.write(full_summary)
+                    # Timestamped chapters the worker made alongside the summary
+                    chapters = None
+                    try:
+                        chapters = cached_chapters(job["video_id"], fetch_transcript(job["video_id"]))
+                    except Exception as e:
+                        print(f"Error loading chapters: {str(e)}")
+                    if chapters:
+                        st.write("Chapters:")
+                        st.markdown(chapters_markdown(job["video_id"], chapters))
+
+                    with st.sidebar.expander("Summarizer"):
+                        st.json(job["stats"])
+                        st.json(queue_stats())
+                        st.json({"translation_cache": translation_cache.stats()})
 
+                    try:
                         selected_language = st.sidebar.selectbox("Select language for translation:", list(languages.keys()))
-                        translated_summary = translate_text(full_summary, languages[selected_language])
+                        translated_summary = cached_translation(full_summary, languages[selected_language])
 
                         st.write(f"Translated Summary in {selected_language}:")
                         st.write(translated_summary)
@@ -441,7 +479,7 @@ elif option == "YouTube Summarizer" or option == "Chatbot":
                             speak_text(translated_summary)
 
                         if st.sidebar.button("Download Summary as PDF"):
-                            pdf_file = generate_pdf(translated_summary)
+                            pdf_file = generate_pdf(translated_summary, chapters, job["video_id"])
                             with open(pdf_file, "rb") as file:
                                 st.sidebar.download_button(
                                     label="Download PDF",
@@ -450,9 +488,7 @@ elif option == "YouTube Summarizer" or option == "Chatbot":
                                     mime="application/octet-stream"
                                 )
                     except Exception as e:
-                        st.error("Error summarizing video. Please check the video link and try again.")
-                else:
-                    st.warning("Please enter a valid video link.")
+                        st.error("Error translating the summary. Please try again.")
 
         # Chatbot Logic
         elif option == "Chatbot":
@@ -462,80 +498,79 @@ elif option == "YouTube Summarizer" or option == "Chatbot":
             chat_container = st.container()
             
             message = st.text_input("Your message:", placeholder="Type your message here...")
+
+            # Answers to repeated or near-identical questions come from the response cache unless the user opts out
+            username = st.session_state["username"]
+            use_cache = st.sidebar.checkbox("Reuse answers to similar questions", value=not chat_cache.is_opted_out(username))
+            if use_cache:
+                chat_cache.opt_in(username)
+            else:
+                chat_cache.opt_out(username)
+            with st.sidebar.expander("Response cache"):
+                st.json(chat_cache.stats())
+
             if st.button("Send", type="primary"):
-                violation = check_for_violations(message)
-                if violation:
-                    st.markdown(
-                        f"""
-                        <div style="background-color:#ffcccb; padding: 10px; border-radius: 5px;">
-                            <span style="color:red; font-size:24px; font-weight:bold;">⚠</span>
-                            <span style="color:red; font-size:18px; font-weight:bold;"> *Warning*: {violation['description']} detected.</span>
-                            <br>
-                            <span style="color:red;">Risk Level: {violation['risk_level']}</span>
-                        </div>
-                        """,
-                        unsafe_allow_html=True
-                    )
+                found_violations = check_for_violations(message)
+                if found_violations:
+                    for violation in found_violations:
+                        st.markdown(
+                            f"""
+                            <div style="background-color:#ffcccb; padding: 10px; border-radius: 5px; margin-bottom: 5px;">
+                                <span style="color:red; font-size:24px; font-weight:bold;">⚠</span>
+                                <span style="color:red; font-size:18px; font-weight:bold;"> *Warning*: {violation['description']} detected.</span>
+                                <br>
+                                <span style="color:red;">Risk Level: {violation['risk_level']}</span>
+                            </div>
+                            """,
+                            unsafe_allow_html=True
+                        )
                 else:
-                    with st.spinner('Thinking...'):
-                        try:
-                            response = get_chatgpt_response(message)
-                            response_data = json.loads(response)
-                            
-                            # Extract just the result message
-                            if isinstance(response_data, dict) and 'result' in response_data:
-                                bot_response = response_data['result']
-                                
-                                # Convert markdown-style lists to HTML lists
-                                if '\n-' in bot_response:
-                                    # Split the response into parts
-                                    parts = bot_response.split('\n-')
-                                    main_text = parts[0]
-                                    list_items = parts[1:]
-                                    
-                                    # Format as HTML
-                                    formatted_response = f"{main_text}<ul style='color: #000000; margin: 10px 0; padding-left: 20px;'>"
-                                    for item in list_items:
-                                        formatted_response += f"<li style='color: #000000; margin: 5px 0;'>{item.strip()}</li>"
-                                    formatted_response += "</ul>"
-                                else:
-                                    formatted_response = bot_response
+                    try:
+                        with chat_container:
+                            # User message
+                            st.markdown(
+                                f"""
+                                <div style="display: flex; justify-content: flex-end; margin-bottom: 10px;">
+                                    <div style="background-color: #e6f3ff; padding: 10px; border-radius: 15px; max-width: 70%;">
+                                        <p style="margin: 0; color: #000000;"><strong style="color: #000000;">You:</strong> {message}</p>
+                                    </div>
+                                </div>
+                                """,
+                                unsafe_allow_html=True
+                            )
+
+                            # Bot response, rendered token by token as it streams in
+                            bot_placeholder = st.empty()
+                            bot_placeholder.markdown(bot_bubble("<em>Thinking...</em>"), unsafe_allow_html=True)
+                            cached = chat_cache.lookup(message, user=username)
+                            if cached:
+                                bot_response = cached.response
+                            else:
+                                bot_response = ""
+                                for piece in stream_chatgpt_response(message):
+                                    bot_response += piece
+                                    bot_placeholder.markdown(bot_bubble(bot_response), unsafe_allow_html=True)
+                                # API errors raise before this point; never cache an empty reply either
+                                if bot_response.strip():
+                                    chat_cache.store(message, bot_response, user=username)
+
+                            if bot_response:
+                                formatted_response = format_bot_response(bot_response)
                             else:
                                 formatted_response = "I apologize, but I couldn't process your request at the moment."
-                            
-                            with chat_container:
-                                # User message
-                                st.markdown(
-                                    f"""
-                                    <div style="display: flex; justify-content: flex-end; margin-bottom: 10px;">
-                                        <div style="background-color: #e6f3ff; padding: 10px; border-radius: 15px; max-width: 70%;">
-                                            <p style="margin: 0; color: #000000;"><strong style="color: #000000;">You:</strong> {message}</p>
-                                        </div>
-                                    </div>
-                                    """,
-                                    unsafe_allow_html=True
-                                )
-                                
-                                # Bot response
-                                st.markdown(
-                                    f"""
-                                    <div style="display: flex; justify-content: flex-start; margin-bottom: 10px;">
-                                        <div style="background-color: #f0f0f0; padding: 10px; border-radius: 15px; max-width: 70%;">
-                                            <div style="margin: 0; color: #000000;">
-                                                <strong style="color: #000000;">Assistant:</strong> {formatted_response}
-                                            </div>
-                                        </div>
-                                    </div>
-                                    """,
-                                    unsafe_allow_html=True
-                                )
-                                
-                                st.markdown("<hr style='margin: 20px 0; border-color: #e0e0e0;'>", unsafe_allow_html=True)
-                                
-                        except json.JSONDecodeError as e:
-                            st.error("I apologize, but I encountered an error processing your request. Please try again.")
-                        except Exception as e:
-                            st.error("An unexpected error occurred. Please try again later.")
+                            bot_placeholder.markdown(bot_bubble(formatted_response), unsafe_allow_html=True)
+                            if cached and cached.match == "similar":
+                                st.caption(f"Answered from a similar earlier question: \"{cached.question}\"")
+
+                            st.markdown("<hr style='margin: 20px 0; border-color: #e0e0e0;'>", unsafe_allow_html=True)
+
+                    except json.JSONDecodeError as e:
+                        st.error("I apologize, but I encountered an error processing your request. Please try again.")
+                    except ChatAPIError as e:
+                        print(f"Error getting chat response: {str(e)}")
+                        st.error("The chat service is unavailable right now. Please try again later.")
+                    except Exception as e:
+                        st.error("An unexpected error occurred. Please try again later.")
 
     else:
         st.warning("Please log in or register to access this feature.")
@@ -561,7 +596,3 @@ elif option == "Image to Text":
             """,
             unsafe_allow_html=True
         )
-
-# Closing database connection
-cursor.close()
-db.close()
@@ -0,0 +1,77 @@
+# app_cache.py
+# Streamlit caches shared by the app pages. Every widget interaction re-runs
+# the whole page script, so heavy singletons (text-to-speech engine, user
+# store, chat client) are created once per server process with
+# st.cache_resource, and transcripts and translations are memoized with
+# st.cache_data on explicit keys (video ID; text and language). A rerun that
+# only toggles a sidebar button then does no model or network work.
+#
+# Finished summaries live in the disk summary cache (summary_cache.py), keyed
+# on the transcript and generation settings; forget_video() invalidates one
+# video's stored transcript and summary.
+import os
+
+import streamlit as st
+
+from chat_client import get_chat_client
+from model_registry import cache_model_name
+from summary_cache import summary_cache, summary_key
+from transcript_store import get_transcript, get_transcript_store, join_transcript
+from translation import translate_many, translate_text
+from user_store import get_user_store
+
+TRANSCRIPT_TTL_SECONDS = int(os.environ.get("TRANSCRIPT_CACHE_TTL_SECONDS", str(6 * 3600)))
+
+
+# Function to get the text-to-speech engine, created once per server process
+@st.cache_resource
+def get_tts_engine():
+    import pyttsx3
+    return pyttsx3.init()
+
+
+# Function to get the user store (connection pool), created once per server process
+@st.cache_resource
+def get_cached_user_store():
+    return get_user_store()
+
+
+# Function to get the pooled chat client, created once per server process
+@st.cache_resource
+def get_cached_chat_client():
+    return get_chat_client()
+
+
+# Function to fetch a video's transcript segments, cached per video ID (backed by the on-disk transcript store)
+@st.cache_data(ttl=TRANSCRIPT_TTL_SECONDS, max_entries=256, show_spinner=False)
+def fetch_transcript(video_id):
+    return get_transcript(video_id)
+
+
+# Function to translate text, cached per (text, language)
+@st.cache_data(max_entries=1024, show_spinner=False)
+def cached_translation(text, lang):
+    return translate_text(text, lang)
+
+
+# Function to translate text into several languages, cached per (text, languages)
+@st.cache_data(max_entries=1024, show_spinner=False)
+def cached_translations(text, langs):
+    return translate_many(text, list(langs))
+
+
+# Function to build the disk summary cache key for a video's transcript
+def video_summary_key(video_id, transcript_text, max_length, min_length, model_name=None):
+    return summary_key(video_id, transcript_text, cache_model_name(model_name), max_length, min_length)
+
+
+# Function to drop a video's cached transcript and summary so the next run fetches and summarizes again
+def forget_video(video_id, max_length, min_length, model_name=None):
+    try:
+        transcript_text = join_transcript(fetch_transcript(video_id))
+        summary_cache.delete(video_summary_key(video_id, transcript_text, max_length, min_length, model_name))
+        get_transcript_store().delete(video_id)
+    except Exception as e:
+        print(f"Error clearing cached summary: {str(e)}")
+    # st.cache_data in this Streamlit version clears a function's entries all at once
+    fetch_transcript.clear()
@@ -0,0 +1,128 @@
+# batch_moderation.py
+# Offline screening of chat logs and transcripts with the moderation engine.
+# Messages are read lazily, scanned in batches across a process pool with a
+# bounded number of batches in flight (so memory stays flat on any input
+# size), and written out in input order as one JSON object per line.
+#
+# Input is plain text (one message per line) or JSONL with a "text" field
+# and an optional "id". A missing or null text scans as empty and numbers are
+# scanned as strings; records whose text is a list or object are skipped with
+# a warning on stderr rather than stopping the run.
+#
+# Usage: python batch_moderation.py chat_log.jsonl -o scores.jsonl [--workers 4] [--min-level 3]
+#        cat messages.txt | python batch_moderation.py - > scores.jsonl
+import argparse
+import json
+import os
+import sys
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+from moderation import moderator
+
+DEFAULT_BATCH_SIZE = 1000
+# Each matched term adds its category's risk level; a score of 1.0 is two level-5 hits
+RISK_SCORE_SCALE = 10.0
+
+
+# Function to aggregate the violations found in one message into a single record
+def score_message(message_id, text):
+    found = moderator.scan(text)
+    total = sum(violation["risk_level"] * len(violation["matches"]) for violation in found)
+    return {
+        "id": message_id,
+        "risk_level": found[0]["risk_level"] if found else 0,
+        "risk_score": round(min(1.0, total / RISK_SCORE_SCALE), 3),
+        "violations": found,
+    }
+
+
+# Function to score one batch of (id, text) pairs in a worker process
+def _score_batch(batch):
+    return [score_message(message_id, text) for message_id, text in batch]
+
+
+# Function to read (id, text) pairs from a file of plain text or JSONL lines
+def read_messages(lines):
+    for number, line in enumerate(lines, 1):
+        line = line.rstrip("\n")
+        if not line.strip():
+            continue
+        if line.lstrip().startswith("{"):
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError:
+                record = None
+            if isinstance(record, dict):
+                message_id, text = record.get("id", number), record.get("text")
+                if isinstance(text, (dict, list)):
+                    print(f"Error reading line {number}: \"text\" is not a string, skipping", file=sys.stderr)
+                    continue
+                yield message_id, "" if text is None else str(text)
+                continue
+        yield number, line
+
+
+def _batches(messages, batch_size):
+    batch = []
+    for message in messages:
+        batch.append(message)
+        if len(batch) >= batch_size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+# Function to score any iterable of (id, text) pairs, yielding records in input order.
+# At most workers * 2 batches are queued at once; workers=1 scans in this process.
+def moderate_stream(messages, workers=None, batch_size=DEFAULT_BATCH_SIZE):
+    workers = workers or os.cpu_count() or 1
+    if workers == 1:
+        for batch in _batches(messages, batch_size):
+            yield from _score_batch(batch)
+        return
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        pending = deque()
+        for batch in _batches(messages, batch_size):
+            pending.append(executor.submit(_score_batch, batch))
+            if len(pending) >= workers * 2:
+                yield from pending.popleft().result()
+        while pending:
+            yield from pending.popleft().result()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Score messages for moderation risk, one JSON line per message")
+    parser.add_argument("input", help="text or JSONL file of messages, '-' for stdin")
+    parser.add_argument("-o", "--output", default="-", help="JSONL output file, '-' for stdout")
+    parser.add_argument("--workers", type=int, default=None, help="worker processes (default: CPU count)")
+    parser.add_argument("--batch-size", type=int, default=DEFAULT_BATCH_SIZE)
+    parser.add_argument("--min-level", type=int, default=0, help="only write messages at or above this risk level")
+    args = parser.parse_args()
+
+    source = sys.stdin if args.input == "-" else open(args.input, encoding="utf-8")
+    output = sys.stdout if args.output == "-" else open(args.output, "w", encoding="utf-8")
+    scanned = flagged = 0
+    start = time.perf_counter()
+    try:
+        for record in moderate_stream(read_messages(source), args.workers, args.batch_size):
+            scanned += 1
+            if record["risk_level"]:
+                flagged += 1
+            if record["risk_level"] >= args.min_level:
+                output.write(json.dumps(record) + "\n")
+    finally:
+        if source is not sys.stdin:
+            source.close()
+        if output is not sys.stdout:
+            output.close()
+    elapsed = time.perf_counter() - start
+    # Progress goes to stderr so stdout stays valid JSONL
+    print(f"Scanned {scanned} messages ({flagged} flagged) in {elapsed:.2f}s: "
+          f"{scanned / elapsed if elapsed else 0:.1f} messages/sec", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,204 @@
+# batch_summarize.py
+# Overnight summarization of whole playlists or channels. Links are read from
+# a file, transcripts are fetched concurrently into the transcript store
+# (rate limited, see transcript_store.py), and each video is handed to a pool
+# of summarizer workers as soon as its transcript is in. Worker processes are
+# spawned, not forked, so none inherits this process's SQLite connections or
+# threads; each opens its own caches and loads the model once. Each record
+# carries the summary and its timestamped chapters (see chapters.py). Results
+# are appended to a JSONL file as they finish, so a restarted run skips every
+# video that already has a summary.
+#
+# Prints videos/hour and per-stage timing (transcript fetch, queue wait,
+# summarization) to stderr when done.
+#
+# Usage: python batch_summarize.py links.txt -o summaries.jsonl [--workers 2] [--fetch-concurrency 4]
+#        python batch_summarize.py links.txt -o summaries.jsonl --no-resume
+import argparse
+import json
+import multiprocessing
+import os
+import re
+import sys
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, ThreadPoolExecutor, wait
+
+from batch_summarizer import SUMMARY_MAX_LENGTH, SUMMARY_MIN_LENGTH
+from transcript_store import PREFETCH_CONCURRENCY, get_transcript_store
+
+STAGES = ("fetch", "queue", "summarize")
+# YouTube video IDs are 11 characters of [A-Za-z0-9_-]
+_VIDEO_ID_RE = re.compile(r"[A-Za-z0-9_-]{11}")
+
+
+# Function to pin torch threads, open the caches and load the model once in each worker process
+def _init_worker(threads):
+    import torch
+    torch.set_num_threads(threads)
+    from youtube_summarizer import get_default_summarizer
+    get_default_summarizer()
+    get_transcript_store()
+
+
+# Function run in a worker: summarize one video and its chapters, returning (summary, chapters, seconds, stats)
+def _summarize_video(video_id, max_length, min_length):
+    from youtube_summarizer import get_video_chapters, get_video_summary
+    start = time.perf_counter()
+    stats = {}
+    summary = get_video_summary(video_id, max_length, min_length, stats=stats)
+    # Chapters come from the chunk summaries the full summary just cached
+    chapters = get_video_chapters(video_id, max_length, min_length) if summary else []
+    return summary, chapters, time.perf_counter() - start, stats
+
+
+# Function to read video links (one per line, '#' comments allowed) as (link, video_id) pairs;
+# video_id is None for lines that are neither a watch?v= link nor a bare video ID
+def read_links(lines):
+    from youtube_summarizer import extract_video_id
+    for line in lines:
+        link = line.strip()
+        if not link or link.startswith("#"):
+            continue
+        # Bare IDs are accepted as well as full links
+        if _VIDEO_ID_RE.fullmatch(link):
+            yield link, link
+        else:
+            yield link, extract_video_id(link)
+
+
+# Function to collect the video IDs already summarized in an earlier run's output
+def completed_videos(output_path):
+    done = set()
+    if not os.path.exists(output_path):
+        return done
+    with open(output_path, encoding="utf-8") as f:
+        for line in f:
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError:
+                # A line cut short when the last run was stopped
+                continue
+            if record.get("summary"):
+                done.add(record["video_id"])
+    return done
+
+
+# Function to get the summarizer pool; one worker runs in this process
+def _worker_pool(workers):
+    if workers <= 1:
+        return ThreadPoolExecutor(max_workers=1)
+    threads = max(1, (os.cpu_count() or 1) // workers)
+    return ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn"),
+                               initializer=_init_worker, initargs=(threads,))
+
+
+# Function to summarize (link, video_id) pairs, yielding one record per video as it finishes
+def summarize_videos(videos, workers=1, fetch_concurrency=PREFETCH_CONCURRENCY,
+                     max_length=SUMMARY_MAX_LENGTH, min_length=SUMMARY_MIN_LENGTH, timings=None):
+    timings = timings if timings is not None else {stage: [] for stage in STAGES}
+    store = get_transcript_store()
+
+    def fetch(video_id):
+        start = time.perf_counter()
+        store.get(video_id)
+        return time.perf_counter() - start
+
+    with ThreadPoolExecutor(max_workers=fetch_concurrency) as fetchers, _worker_pool(workers) as pool:
+        fetching = {fetchers.submit(fetch, video_id): (link, video_id) for link, video_id in videos}
+        summarizing = {}
+        while fetching or summarizing:
+            finished, _ = wait(list(fetching) + list(summarizing), return_when=FIRST_COMPLETED)
+            for future in finished:
+                if future in fetching:
+                    link, video_id = fetching.pop(future)
+                    try:
+                        timings["fetch"].append(future.result())
+                    except Exception as e:
+                        yield {"video_id": video_id, "link": link, "summary": None,
+                               "error": f"transcript unavailable: {str(e)}"}
+                        continue
+                    # The worker reads the transcript back from the store, so only the ID crosses processes
+                    job = pool.submit(_summarize_video, video_id, max_length, min_length)
+                    summarizing[job] = (link, video_id, time.perf_counter())
+                    continue
+
+                link, video_id, queued = summarizing.pop(future)
+                try:
+                    summary, chapters, seconds, stats = future.result()
+                except Exception as e:
+                    yield {"video_id": video_id, "link": link, "summary": None, "error": str(e)}
+                    continue
+                timings["summarize"].append(seconds)
+                timings["queue"].append(max(0.0, time.perf_counter() - queued - seconds))
+                record = {"video_id": video_id, "link": link, "summary": summary, "chapters": chapters,
+                          "summarize_seconds": round(seconds, 2), "cached": bool(stats.get("cached"))}
+                if not summary:
+                    record["error"] = "summarization failed"
+                yield record
+
+
+# Function to format per-stage timing for the report
+def stage_report(timings):
+    lines = []
+    for stage in STAGES:
+        values = timings.get(stage) or []
+        if values:
+            lines.append(f"  {stage:<10} total {sum(values):8.1f}s  mean {sum(values) / len(values):6.2f}s"
+                         f"  max {max(values):6.2f}s  ({len(values)} videos)")
+    return "\n".join(lines)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Summarize a file of YouTube links, one JSON line per video")
+    parser.add_argument("links", help="file with one video link or ID per line, '-' for stdin")
+    parser.add_argument("-o", "--output", required=True, help="JSONL file to append summaries to")
+    parser.add_argument("--workers", type=int, default=1, help="summarizer worker processes (each loads the model)")
+    parser.add_argument("--fetch-concurrency", type=int, default=PREFETCH_CONCURRENCY)
+    parser.add_argument("--max-length", type=int, default=SUMMARY_MAX_LENGTH)
+    parser.add_argument("--min-length", type=int, default=SUMMARY_MIN_LENGTH)
+    parser.add_argument("--no-resume", action="store_true", help="start the output file over")
+    args = parser.parse_args()
+
+    source = sys.stdin if args.links == "-" else open(args.links, encoding="utf-8")
+    try:
+        links = list(read_links(source))
+    finally:
+        if source is not sys.stdin:
+            source.close()
+
+    done = set() if args.no_resume else completed_videos(args.output)
+    videos, invalid, seen = [], [], set(done)
+    for link, video_id in links:
+        if not video_id:
+            invalid.append(link)
+        elif video_id not in seen:
+            seen.add(video_id)
+            videos.append((link, video_id))
+    for link in invalid:
+        print(f"Error extracting video ID from {link}", file=sys.stderr)
+    print(f"{len(videos)} videos to summarize ({len(done)} already done, {len(invalid)} invalid links)",
+          file=sys.stderr)
+
+    timings = {stage: [] for stage in STAGES}
+    summarized = failed = 0
+    start = time.perf_counter()
+    with open(args.output, "w" if args.no_resume else "a", encoding="utf-8") as output:
+        for record in summarize_videos(videos, args.workers, args.fetch_concurrency,
+                                       args.max_length, args.min_length, timings):
+            output.write(json.dumps(record, ensure_ascii=False) + "\n")
+            # Flushed per video so a stopped run keeps everything finished so far
+            output.flush()
+            if record.get("summary"):
+                summarized += 1
+            else:
+                failed += 1
+                print(f"Error summarizing {record['video_id']}: {record['error']}", file=sys.stderr)
+    elapsed = time.perf_counter() - start
+
+    print(f"Summarized {summarized} videos ({failed} failed) in {elapsed:.1f}s: "
+          f"{summarized / elapsed * 3600 if elapsed else 0:.1f} videos/hour", file=sys.stderr)
+    print(stage_report(timings), file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,91 @@
+# bench/chat_bench.py
+# Latency and throughput of the chat client against the local stub server:
+# a new connection per message (the old get_chatgpt_response behaviour)
+# versus the pooled keep-alive ChatClient.
+#
+# Usage: python bench/chat_bench.py [--requests 200] [--concurrency 8] [--latency 0.05]
+#        [--certfile cert.pem --keyfile key.pem]   (include TLS handshakes)
+import argparse
+import http.client
+import json
+import ssl
+import time
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlsplit
+
+from common import percentile, write_results
+
+from chat_client import ChatClient
+from chat_stub_server import start_stub_server
+
+
+# Function to send one message on a brand-new connection, like the original app code
+def unpooled_request(url, context, message):
+    parts = urlsplit(url)
+    if parts.scheme == "https":
+        conn = http.client.HTTPSConnection(parts.hostname, parts.port, context=context)
+    else:
+        conn = http.client.HTTPConnection(parts.hostname, parts.port)
+    payload = json.dumps({"messages": [{"role": "user", "content": message}], "web_access": False})
+    conn.request("POST", parts.path, payload, {'Content-Type': "application/json"})
+    data = conn.getresponse().read()
+    conn.close()
+    return data.decode("utf-8")
+
+
+# Function to run n requests with the given concurrency and collect timings
+def run(send, requests, concurrency):
+    def timed(i):
+        start = time.perf_counter()
+        send(f"question {i}")
+        return time.perf_counter() - start
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        latencies = list(executor.map(timed, range(requests)))
+    elapsed = time.perf_counter() - start
+    return {
+        "requests": requests,
+        "requests_per_sec": round(requests / elapsed, 1),
+        "p50_ms": round(percentile(latencies, 50) * 1000, 2),
+        "p95_ms": round(percentile(latencies, 95) * 1000, 2),
+        "p99_ms": round(percentile(latencies, 99) * 1000, 2),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the chat client against the stub server")
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--latency", type=float, default=0.05)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--certfile", default=None)
+    parser.add_argument("--keyfile", default=None)
+    args = parser.parse_args()
+
+    server, url = start_stub_server(latency=args.latency, error_rate=args.error_rate,
+                                    certfile=args.certfile, keyfile=args.keyfile)
+    # The stub's certificate is self-signed
+    context = ssl._create_unverified_context() if args.certfile else None
+
+    results = {"stub_latency_s": args.latency, "concurrency": args.concurrency}
+    results["unpooled"] = run(lambda m: unpooled_request(url, context, m), args.requests, args.concurrency)
+
+    client = ChatClient(url, api_key="stub", max_concurrency=args.concurrency,
+                        backoff_base=0.01, ssl_context=context)
+    results["pooled"] = run(client.complete, args.requests, args.concurrency)
+    results["pooled"].update(client.stats)
+    client.close()
+    server.shutdown()
+
+    for name in ("unpooled", "pooled"):
+        entry = results[name]
+        print(f"{name:<10}{entry['requests_per_sec']:>8.1f} req/s  p50 {entry['p50_ms']:.1f} ms"
+              f"  p95 {entry['p95_ms']:.1f} ms  p99 {entry['p99_ms']:.1f} ms")
+    print(f"pooled client opened {results['pooled']['connections_opened']} connections, "
+          f"{results['pooled']['retries']} retries")
+    print(f"Results written to {write_results('chat_bench', results)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,85 @@
+# bench/common.py
+# Helpers shared by the benchmark scripts: import path setup, transcript
+# fixtures and a dependency-free ROUGE implementation.
+from collections import Counter
+import glob
+import json
+import os
+import sys
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+PROJECT_DIR = os.path.dirname(BENCH_DIR)
+FIXTURES_DIR = os.path.join(BENCH_DIR, "fixtures")
+RESULTS_DIR = os.path.join(BENCH_DIR, "results")
+
+# Let the scripts import the app modules when run as `python bench/<script>.py`
+if PROJECT_DIR not in sys.path:
+    sys.path.insert(0, PROJECT_DIR)
+
+
+# Function to load the recorded transcripts: {video_id: [{"text", "start", "duration"}, ...]}
+def load_fixtures(fixtures_dir=FIXTURES_DIR):
+    fixtures = {}
+    for path in sorted(glob.glob(os.path.join(fixtures_dir, "*.json"))):
+        with open(path, encoding="utf-8") as f:
+            data = json.load(f)
+        fixtures[data["video_id"]] = data["transcript"]
+    return fixtures
+
+
+# Function to compute the p-th percentile of a list of numbers
+def percentile(values, p):
+    if not values:
+        return None
+    ordered = sorted(values)
+    index = (len(ordered) - 1) * p / 100
+    lower = int(index)
+    upper = min(lower + 1, len(ordered) - 1)
+    return ordered[lower] + (ordered[upper] - ordered[lower]) * (index - lower)
+
+
+def _tokens(text):
+    return [word.strip(".,!?;:\"'()").lower() for word in text.split() if word.strip(".,!?;:\"'()")]
+
+
+def _f1(overlap, candidate_total, reference_total):
+    if not overlap or not candidate_total or not reference_total:
+        return 0.0
+    precision = overlap / candidate_total
+    recall = overlap / reference_total
+    return 2 * precision * recall / (precision + recall)
+
+
+def _ngrams(tokens, n):
+    return Counter(tuple(tokens[i:i + n]) for i in range(len(tokens) - n + 1))
+
+
+def _lcs_length(a, b):
+    previous = [0] * (len(b) + 1)
+    for x in a:
+        current = [0]
+        for j, y in enumerate(b):
+            current.append(previous[j] + 1 if x == y else max(previous[j + 1], current[j]))
+        previous = current
+    return previous[-1]
+
+
+# Function to compute ROUGE-1/2/L F1 of a candidate summary against a reference
+def rouge(candidate, reference):
+    cand, ref = _tokens(candidate), _tokens(reference)
+    scores = {}
+    for n in (1, 2):
+        cand_ngrams, ref_ngrams = _ngrams(cand, n), _ngrams(ref, n)
+        overlap = sum((cand_ngrams & ref_ngrams).values())
+        scores[f"rouge{n}"] = round(_f1(overlap, sum(cand_ngrams.values()), sum(ref_ngrams.values())), 4)
+    scores["rougeL"] = round(_f1(_lcs_length(cand, ref), len(cand), len(ref)), 4)
+    return scores
+
+
+# Function to write benchmark results as JSON under bench/results/
+def write_results(name, results, output=None):
+    output = output or os.path.join(RESULTS_DIR, f"{name}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, "w", encoding="utf-8") as f:
+        json.dump(results, f, indent=2)
+    return output
@@ -0,0 +1,90 @@
+# bench/compare_backends.py
+# Compare summarizer inference backends on the fixture transcripts: load time,
+# summarization latency and ROUGE against the fp32 PyTorch output (or, if
+# PyTorch can't run, the first backend that does). Picks the fastest backend
+# whose ROUGE-L stays within the tolerance.
+#
+# Usage: python bench/compare_backends.py [--model NAME] [--backends pytorch,int8,onnx] [--tolerance 0.9]
+import argparse
+import time
+
+from common import load_fixtures, rouge, write_results
+
+from chunker import chunk_text
+from hierarchical_summarizer import summarize_hierarchical
+from model_registry import DEFAULT_MODEL, get_summarizer, model_stats
+from transcript_store import join_transcript
+
+
+# Function to summarize every fixture with one backend, timing each transcript
+def run_backend(model_name, backend, fixtures):
+    summarizer = get_summarizer(model_name, "cpu", backend)
+    outputs, seconds = {}, {}
+    for video_id, segments in fixtures.items():
+        start = time.perf_counter()
+        chunks = chunk_text(join_transcript(segments), tokenizer=summarizer.tokenizer)
+        # The chunk cache is bypassed so every backend really runs the model
+        outputs[video_id] = summarize_hierarchical(chunks, summarizer, cache=None)
+        seconds[video_id] = time.perf_counter() - start
+    return outputs, seconds
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare summarizer inference backends")
+    parser.add_argument("--model", default=DEFAULT_MODEL)
+    parser.add_argument("--backends", default="pytorch,int8,ipex,onnx")
+    parser.add_argument("--tolerance", type=float, default=0.9,
+                        help="minimum mean ROUGE-L against the fp32 output")
+    parser.add_argument("--output", default=None)
+    args = parser.parse_args()
+
+    fixtures = load_fixtures()
+    backends = [b.strip() for b in args.backends.split(",") if b.strip()]
+    if "pytorch" not in backends:
+        backends.insert(0, "pytorch")
+
+    results = {"model": args.model, "tolerance": args.tolerance, "backends": {}}
+    reference, reference_backend = None, None
+    for backend in backends:
+        try:
+            outputs, seconds = run_backend(args.model, backend, fixtures)
+        except ImportError as e:
+            print(f"Skipping {backend}: {str(e)}")
+            results["backends"][backend] = {"skipped": str(e)}
+            continue
+        # pytorch is listed first; if it was skipped, compare against the first backend that ran
+        if reference is None:
+            reference, reference_backend = outputs, backend
+            results["reference"] = backend
+        scores = [rouge(outputs[v], reference[v]) for v in fixtures]
+        results["backends"][backend] = {
+            "total_seconds": round(sum(seconds.values()), 3),
+            "per_video_seconds": {v: round(s, 3) for v, s in seconds.items()},
+            "rouge1": round(sum(s["rouge1"] for s in scores) / len(scores), 4),
+            "rouge2": round(sum(s["rouge2"] for s in scores) / len(scores), 4),
+            "rougeL": round(sum(s["rougeL"] for s in scores) / len(scores), 4),
+        }
+
+    for entry in model_stats():
+        if entry["backend"] in results["backends"]:
+            results["backends"][entry["backend"]]["load_seconds"] = entry["load_seconds"]
+
+    eligible = [
+        (entry["total_seconds"], backend) for backend, entry in results["backends"].items()
+        if "rougeL" in entry and entry["rougeL"] >= args.tolerance
+    ]
+    results["recommended"] = min(eligible)[1] if eligible else (reference_backend or "pytorch")
+
+    print(f"{'backend':<10}{'load s':>10}{'run s':>10}{'rouge1':>9}{'rouge2':>9}{'rougeL':>9}")
+    for backend, entry in results["backends"].items():
+        if "skipped" in entry:
+            print(f"{backend:<10}  skipped")
+            continue
+        print(f"{backend:<10}{entry.get('load_seconds', 0):>10.2f}{entry['total_seconds']:>10.2f}"
+              f"{entry['rouge1']:>9.3f}{entry['rouge2']:>9.3f}{entry['rougeL']:>9.3f}")
+    print(f"Recommended backend: {results['recommended']} (SUMMARIZER_BACKEND={results['recommended']})")
+    print(f"Results written to {write_results('compare_backends', results, args.output)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,95 @@
+# bench/lstm_inference_bench.py
+# Load test for the LSTM intent model: one model.predict per request padded
+# to max_length (the old chatbot.py path) versus the micro-batching
+# IntentServer, in process and over HTTP. Reports requests/sec and p50/p99.
+#
+# Usage: python bench/lstm_inference_bench.py [--requests 2000] [--concurrency 32] [--max-wait-ms 5]
+#        (run LSTM_CHATBOT/train.py first; train with --mask-zero to measure
+#        per-batch padding, otherwise every batch is padded to max_length)
+import argparse
+import csv
+import json
+import os
+import sys
+import threading
+import time
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+
+from common import PROJECT_DIR, percentile, write_results
+
+sys.path.insert(0, os.path.join(PROJECT_DIR, "LSTM_CHATBOT"))
+
+
+# Function to run n requests with the given concurrency and collect timings
+def run(send, messages, concurrency):
+    def timed(message):
+        start = time.perf_counter()
+        send(message)
+        return time.perf_counter() - start
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        latencies = list(executor.map(timed, messages))
+    elapsed = time.perf_counter() - start
+    return {
+        "requests": len(messages),
+        "requests_per_sec": round(len(messages) / elapsed, 1),
+        "p50_ms": round(percentile(latencies, 50) * 1000, 2),
+        "p99_ms": round(percentile(latencies, 99) * 1000, 2),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Load test the LSTM intent model")
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--max-batch-size", type=int, default=32)
+    parser.add_argument("--max-wait-ms", type=float, default=5.0)
+    args = parser.parse_args()
+
+    from inference_server import IntentServer, start_http_server
+    from lstm_model import DATASET_PATH, encode, load_artifacts, uses_masking
+
+    model, tokenizer, meta = load_artifacts()
+    with open(DATASET_PATH, encoding="utf-8", newline="") as f:
+        inputs = [row["input"] for row in csv.DictReader(f)]
+    messages = [inputs[i % len(inputs)] for i in range(args.requests)]
+
+    # The old path: every request pads to max_length and calls predict on its own
+    predict_lock = threading.Lock()
+
+    def one_at_a_time(message):
+        with predict_lock:
+            return model.predict(encode(tokenizer, [message], padding=meta.get("padding", "pre")), verbose=0)[0][0]
+
+    one_at_a_time(messages[0])
+    results = {"concurrency": args.concurrency, "max_batch_size": args.max_batch_size,
+               "max_wait_ms": args.max_wait_ms, "mask_zero": uses_masking(meta)}
+    results["one_at_a_time"] = run(one_at_a_time, messages, args.concurrency)
+
+    server = IntentServer(model, tokenizer, args.max_batch_size, args.max_wait_ms, meta=meta)
+    server.predict(messages[0])
+    results["micro_batched"] = run(server.predict, messages, args.concurrency)
+    results["micro_batched"].update(server.batcher.stats)
+
+    http_server, url = start_http_server(server)
+
+    def over_http(message):
+        request = urllib.request.Request(url, json.dumps({"text": message}).encode("utf-8"),
+                                         {"Content-Type": "application/json"})
+        with urllib.request.urlopen(request) as response:
+            return json.load(response)["scores"][0]
+
+    results["micro_batched_http"] = run(over_http, messages, args.concurrency)
+    http_server.shutdown()
+    server.close()
+
+    for name in ("one_at_a_time", "micro_batched", "micro_batched_http"):
+        entry = results[name]
+        print(f"{name:<20}{entry['requests_per_sec']:>10.1f} req/s  p50 {entry['p50_ms']:.1f} ms  p99 {entry['p99_ms']:.1f} ms")
+    print(f"Results written to {write_results('lstm_inference', results)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,55 @@
+# bench/lstm_startup_bench.py
+# Startup cost of the LSTM chatbot: fitting the tokenizer and training the
+# model on every start (the old chatbot.py behaviour) versus loading the
+# artifacts saved by train.py. TensorFlow's own import time is reported
+# separately since both paths pay it.
+#
+# Usage: python bench/lstm_startup_bench.py [--epochs 10] [--repeat 3]
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+from common import PROJECT_DIR, write_results
+
+sys.path.insert(0, os.path.join(PROJECT_DIR, "LSTM_CHATBOT"))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark LSTM chatbot startup")
+    parser.add_argument("--epochs", type=int, default=10)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    from lstm_model import encode, load_artifacts, train
+    import_seconds = time.perf_counter() - start
+
+    artifact_dir = tempfile.mkdtemp(prefix="lstm-artifacts-")
+    train_seconds, load_seconds = [], []
+    for _ in range(args.repeat):
+        start = time.perf_counter()
+        train(artifact_dir=artifact_dir, epochs=args.epochs, verbose=0)
+        train_seconds.append(time.perf_counter() - start)
+
+        start = time.perf_counter()
+        model, tokenizer, meta = load_artifacts(artifact_dir)
+        # The first predict builds the graph; count it, the old path paid it on the first message too
+        model.predict(encode(tokenizer, ["hello"]), verbose=0)
+        load_seconds.append(time.perf_counter() - start)
+
+    results = {
+        "epochs": args.epochs,
+        "tensorflow_import_seconds": round(import_seconds, 2),
+        "train_at_startup_seconds": round(min(train_seconds), 2),
+        "load_artifacts_seconds": round(min(load_seconds), 2),
+    }
+    print(f"tensorflow import     {results['tensorflow_import_seconds']:>8.2f} s")
+    print(f"train at startup      {results['train_at_startup_seconds']:>8.2f} s  (before)")
+    print(f"load saved artifacts  {results['load_artifacts_seconds']:>8.2f} s  (after)")
+    print(f"Results written to {write_results('lstm_startup', results)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,71 @@
+# bench/moderation_bench.py
+# Throughput of message moderation on a large synthetic batch: the old
+# per-category substring scan from app.py plus the per-word regex search from
+# LSTM_CHATBOT/chatbot.py, versus the single compiled pattern in moderation.py.
+# Messages are fixture transcript sentences with keywords mixed into a fraction.
+#
+# Usage: python bench/moderation_bench.py [--messages 50000] [--flagged 0.1]
+import argparse
+import random
+import re
+import time
+
+from common import load_fixtures, write_results
+
+from moderation import load_vulgar_words, moderator, violations
+
+
+# Function to reproduce the original check_for_violations followed by contains_vulgar
+def legacy_check(message, vulgar_words):
+    for violation in violations:
+        if any(keyword in message.lower() for keyword in violation["keywords"]):
+            return True
+    return any(re.search(r'\b' + re.escape(word.replace('*', '')) + r'\b', message.lower()) for word in vulgar_words)
+
+
+# Function to build the message batch from fixture sentences, flagging a fraction with a keyword
+def build_messages(count, flagged, seed=0):
+    rng = random.Random(seed)
+    sentences = []
+    for segments in load_fixtures().values():
+        sentences.extend(segment["text"] for segment in segments)
+    keywords = [keyword for violation in violations for keyword in violation["keywords"]]
+    keywords += [word.replace("*", "u") for word in load_vulgar_words()]
+    messages = []
+    for _ in range(count):
+        message = " ".join(rng.sample(sentences, 2))
+        if rng.random() < flagged:
+            message += " " + rng.choice(keywords)
+        messages.append(message)
+    return messages
+
+
+# Function to time one moderation function over the batch
+def run(check, messages):
+    start = time.perf_counter()
+    flagged = sum(1 for message in messages if check(message))
+    elapsed = time.perf_counter() - start
+    return {"messages_per_sec": round(len(messages) / elapsed, 1), "seconds": round(elapsed, 3), "flagged": flagged}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark message moderation")
+    parser.add_argument("--messages", type=int, default=50000)
+    parser.add_argument("--flagged", type=float, default=0.1, help="fraction of messages given a keyword")
+    args = parser.parse_args()
+
+    messages = build_messages(args.messages, args.flagged)
+    vulgar_words = load_vulgar_words()
+    results = {"messages": len(messages)}
+    results["legacy"] = run(lambda m: legacy_check(m, vulgar_words), messages)
+    results["compiled"] = run(moderator.scan, messages)
+
+    for name in ("legacy", "compiled"):
+        entry = results[name]
+        print(f"{name:<10}{entry['messages_per_sec']:>12.1f} msg/s  {entry['seconds']:>8.3f} s  flagged {entry['flagged']}")
+    # The counts differ on purpose: word boundaries stop "message" matching "age", and masked words now match
+    print(f"Results written to {write_results('moderation_bench', results)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,159 @@
+# bench/run_bench.py
+# Offline benchmark for the summarizer pipeline. Runs chunk_text,
+# summarize_chunk, summarize_transcript and get_video_summary against the
+# recorded fixture transcripts (replayed by the transcript store), and
+# writes p50/p95 latency, tokens per second, peak RSS and model load time as
+# JSON so runs on different commits can be compared.
+#
+# Usage:
+#   python bench/run_bench.py --model sshleifer/distilbart-cnn-6-6 --repeat 3
+#   python bench/run_bench.py --baseline bench/results/bench-<old commit>.json
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+from common import FIXTURES_DIR, PROJECT_DIR, load_fixtures, percentile, write_results
+
+# Small enough for CI-sized runs; pass a local directory for fully offline machines
+CI_MODEL = "sshleifer/distilbart-cnn-6-6"
+
+
+# Function to read the peak resident memory of this process in MB
+def peak_rss_mb():
+    try:
+        import resource
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return round(peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024, 1)
+    except ImportError:
+        import psutil
+        return round(psutil.Process().memory_info().peak_wset / (1024 * 1024), 1)
+
+
+# Function to name the commit being measured
+def git_commit():
+    try:
+        return subprocess.check_output(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=PROJECT_DIR, text=True
+        ).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+# Function to time fn() repeatedly, recording seconds and input tokens per call
+def measure(samples, name, fn, tokens=0):
+    start = time.perf_counter()
+    result = fn()
+    samples.setdefault(name, []).append((time.perf_counter() - start, tokens))
+    return result
+
+
+# Function to reduce raw samples to latency percentiles and throughput
+def summarize_samples(samples):
+    report = {}
+    for name, values in samples.items():
+        seconds = [s for s, _ in values]
+        tokens = sum(t for _, t in values)
+        report[name] = {
+            "calls": len(values),
+            "p50_ms": round(percentile(seconds, 50) * 1000, 2),
+            "p95_ms": round(percentile(seconds, 95) * 1000, 2),
+            "tokens_per_sec": round(tokens / sum(seconds), 1) if tokens and sum(seconds) else None,
+        }
+    return report
+
+
+# Function to print the change in p50 latency against an earlier result file
+def compare(report, baseline_path):
+    with open(baseline_path, encoding="utf-8") as f:
+        baseline = json.load(f)
+    print(f"Compared with {baseline.get('commit')} ({baseline_path}):")
+    for name, entry in report["stages"].items():
+        old = baseline.get("stages", {}).get(name)
+        if old:
+            change = (entry["p50_ms"] - old["p50_ms"]) / old["p50_ms"] * 100 if old["p50_ms"] else 0
+            print(f"  {name:<28}{old['p50_ms']:>10.1f} ms -> {entry['p50_ms']:>10.1f} ms ({change:+.1f}%)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Offline summarizer benchmark")
+    parser.add_argument("--model", default=CI_MODEL, help="model name or local model directory")
+    parser.add_argument("--backend", default=None)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--online", action="store_true",
+                        help="allow downloading the model instead of using the local Hugging Face cache")
+    parser.add_argument("--output", default=None)
+    parser.add_argument("--baseline", default=None, help="earlier result JSON to compare against")
+    args = parser.parse_args()
+
+    # Settings must be in place before the app modules read them at import
+    os.environ["SUMMARIZER_MODEL"] = args.model
+    if args.backend:
+        os.environ["SUMMARIZER_BACKEND"] = args.backend
+    if not args.online:
+        os.environ["HF_HUB_OFFLINE"] = "1"
+        os.environ["TRANSFORMERS_OFFLINE"] = "1"
+    # A throwaway cache directory keeps earlier runs from turning model work into cache hits
+    os.environ["SUMMARIZER_CACHE_DIR"] = tempfile.mkdtemp(prefix="summarizer-bench-")
+    # Transcripts come from the recorded fixtures, never the network
+    os.environ["TRANSCRIPT_FIXTURE_DIR"] = FIXTURES_DIR
+
+    fixtures = load_fixtures()
+
+    import youtube_summarizer
+    from chunker import count_tokens
+    from model_registry import model_stats
+    from transcript_store import join_transcript
+
+    tokenizer = youtube_summarizer.get_default_summarizer().tokenizer
+    samples = {}
+    for _ in range(args.repeat):
+        for video_id, segments in fixtures.items():
+            text = join_transcript(segments)
+            n_tokens = count_tokens(text, tokenizer)
+
+            chunks = measure(samples, "chunk_text",
+                             lambda: list(youtube_summarizer.chunk_text(text, tokenizer=tokenizer)), n_tokens)
+
+            youtube_summarizer.chunk_cache.clear()
+            first_tokens = count_tokens(chunks[0], tokenizer)
+            measure(samples, "summarize_chunk",
+                    lambda: youtube_summarizer.summarize_chunk(chunks[0]), first_tokens)
+
+            youtube_summarizer.chunk_cache.clear()
+            measure(samples, "summarize_transcript",
+                    lambda: youtube_summarizer.summarize_transcript(text), n_tokens)
+
+            youtube_summarizer.chunk_cache.clear()
+            youtube_summarizer.summary_cache.clear()
+            measure(samples, "get_video_summary",
+                    lambda: youtube_summarizer.get_video_summary(video_id), n_tokens)
+            measure(samples, "get_video_summary_cached",
+                    lambda: youtube_summarizer.get_video_summary(video_id), n_tokens)
+
+    report = {
+        "commit": git_commit(),
+        "model": args.model,
+        "backend": os.environ.get("SUMMARIZER_BACKEND", "pytorch"),
+        "fixtures": len(fixtures),
+        "repeat": args.repeat,
+        "model_load_seconds": sum(entry["load_seconds"] for entry in model_stats()),
+        "peak_rss_mb": peak_rss_mb(),
+        "stages": summarize_samples(samples),
+    }
+
+    print(f"{'stage':<28}{'p50 ms':>10}{'p95 ms':>10}{'tok/s':>10}")
+    for name, entry in report["stages"].items():
+        print(f"{name:<28}{entry['p50_ms']:>10.1f}{entry['p95_ms']:>10.1f}{entry['tokens_per_sec'] or 0:>10.1f}")
+    print(f"model load {report['model_load_seconds']:.2f}s, peak RSS {report['peak_rss_mb']} MB")
+    print(f"Results written to {write_results('bench-' + report['commit'], report, args.output)}")
+
+    if args.baseline:
+        compare(report, args.baseline)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,98 @@
+# bench/user_store_bench.py
+# Concurrent login load test for the user store on a throwaway SQLite
+# database: the old lookup (plaintext password, no index on username, one
+# shared connection behind a lock) versus SQLiteUserStore at a few hashing
+# costs. Reports logins/sec and p50/p99 latency.
+#
+# Usage: python bench/user_store_bench.py [--users 20000] [--logins 2000] [--concurrency 16]
+#        [--iterations 1000,50000,200000]
+import argparse
+import os
+import random
+import sqlite3
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from common import percentile, write_results
+
+from user_store import SQLiteUserStore, hash_password
+
+
+# Function to run the logins with the given concurrency and collect timings
+def run(login, attempts, concurrency):
+    def timed(attempt):
+        start = time.perf_counter()
+        ok = login(*attempt)
+        return time.perf_counter() - start, ok
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        samples = list(executor.map(timed, attempts))
+    elapsed = time.perf_counter() - start
+    latencies = [seconds for seconds, _ in samples]
+    return {
+        "logins": len(attempts),
+        "succeeded": sum(1 for _, ok in samples if ok),
+        "logins_per_sec": round(len(attempts) / elapsed, 1),
+        "p50_ms": round(percentile(latencies, 50) * 1000, 2),
+        "p99_ms": round(percentile(latencies, 99) * 1000, 2),
+    }
+
+
+# Function to build the old schema (no index, plaintext) and its login function
+def legacy_login(path, users):
+    conn = sqlite3.connect(path, check_same_thread=False)
+    conn.execute("CREATE TABLE users (id INTEGER PRIMARY KEY AUTOINCREMENT, username TEXT NOT NULL, password TEXT NOT NULL)")
+    conn.executemany("INSERT INTO users (username, password) VALUES (?, ?)", users)
+    conn.commit()
+    lock = threading.Lock()
+
+    def login(username, password):
+        with lock:
+            cursor = conn.cursor()
+            cursor.execute("SELECT * FROM users WHERE username = ? AND password = ?", (username, password))
+            return cursor.fetchone() is not None
+
+    return login
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Load test concurrent logins")
+    parser.add_argument("--users", type=int, default=20000)
+    parser.add_argument("--logins", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--iterations", default="1000,50000,200000", help="comma-separated PBKDF2 costs to test")
+    args = parser.parse_args()
+
+    rng = random.Random(0)
+    users = [(f"user{i}", f"password{i}") for i in range(args.users)]
+    attempts = [rng.choice(users) for _ in range(args.logins)]
+    attempted = {name for name, _ in attempts}
+    workdir = tempfile.mkdtemp(prefix="user-store-bench-")
+
+    results = {"users": args.users, "concurrency": args.concurrency}
+    results["legacy"] = run(legacy_login(os.path.join(workdir, "legacy.sqlite3"), users), attempts, args.concurrency)
+
+    for iterations in [int(value) for value in args.iterations.split(",")]:
+        store = SQLiteUserStore(os.path.join(workdir, f"users-{iterations}.sqlite3"), iterations)
+        # Seed directly, hashing only the accounts that log in; the rest share one hash
+        # so the table still has every row without paying the full cost per user
+        filler = hash_password("unused", iterations)
+        rows = [(name, hash_password(password, iterations) if name in attempted else filler)
+                for name, password in users]
+        with store.connection() as conn:
+            conn.executemany("INSERT INTO users (username, password) VALUES (?, ?)", rows)
+            conn.commit()
+        results[f"pbkdf2_{iterations}"] = run(store.login_user, attempts, args.concurrency)
+
+    for name, entry in results.items():
+        if isinstance(entry, dict):
+            print(f"{name:<16}{entry['logins_per_sec']:>10.1f} logins/s  p50 {entry['p50_ms']:.2f} ms"
+                  f"  p99 {entry['p99_ms']:.2f} ms  ({entry['succeeded']}/{entry['logins']} ok)")
+    print(f"Results written to {write_results('user_store_bench', results)}")
+
+
+if __name__ == "__main__":
+    main()
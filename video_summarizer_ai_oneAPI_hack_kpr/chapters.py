@@ -0,0 +1,124 @@
+# chapters.py
+# Timestamped chapters from transcript segments. The transcript is flattened
+# exactly as the rest of the app does (' '.join of segment texts) while
+# recording where each segment starts, so the character offsets the chunker
+# returns map back to segment times. Chunks come out in transcript order, so
+# the mapping is a single forward sweep over the segments and stays linear on
+# multi-hour transcripts.
+#
+# Each chunk summary becomes one chapter. Chunk summaries are memoized in the
+# chunk cache (the same entries the map stage of the full summary uses), and
+# the finished chapter list is stored in the summary cache per video.
+from collections import namedtuple
+
+from batch_summarizer import DEFAULT_BATCH_SIZE, SUMMARY_MAX_LENGTH, SUMMARY_MIN_LENGTH, summarize_chunks_batched
+from chunker import iter_chunks
+from model_registry import cache_model_name, get_summarizer
+from summary_cache import chunk_cache, summary_cache, summary_key
+from transcript_store import join_transcript
+
+# A chunk of transcript text; start/end are times in seconds
+TimedChunk = namedtuple("TimedChunk", ["text", "start", "end", "n_tokens"])
+
+
+# Function to flatten segments into transcript text, returning (text, character offset of each segment)
+def join_segments(segments):
+    offsets = []
+    position = 0
+    for segment in segments:
+        offsets.append(position)
+        position += len(segment["text"]) + 1
+    return join_transcript(segments), offsets
+
+
+# Function to split segments into token-budgeted chunks tagged with the time range they cover
+def iter_timed_chunks(segments, tokenizer=None, max_tokens=None):
+    if not segments:
+        return
+    text, offsets = join_segments(segments)
+    first = last = 0
+    for chunk in iter_chunks(text, tokenizer, max_tokens=max_tokens):
+        if not chunk.text:
+            continue
+        # Both ends only move forward, so the whole sweep is one pass over the segments
+        while first + 1 < len(offsets) and offsets[first + 1] <= chunk.start:
+            first += 1
+        last = max(last, first)
+        while last + 1 < len(offsets) and offsets[last + 1] < chunk.end:
+            last += 1
+        end = segments[last]["start"] + segments[last].get("duration", 0.0)
+        yield TimedChunk(chunk.text, segments[first]["start"], end, chunk.n_tokens)
+
+
+# Function to summarize each chunk of a transcript into a chapter {"start", "end", "summary"}
+def summarize_chapters(segments, summarizer=None, batch_size=DEFAULT_BATCH_SIZE,
+                       max_length=SUMMARY_MAX_LENGTH, min_length=SUMMARY_MIN_LENGTH, cache=chunk_cache):
+    summarizer = summarizer or get_summarizer()
+    chunks = list(iter_timed_chunks(segments, tokenizer=summarizer.tokenizer))
+    summaries = summarize_chunks_batched(
+        [chunk.text for chunk in chunks], summarizer, batch_size=batch_size,
+        max_length=max_length, min_length=min_length, cache=cache
+    )
+    return [{"start": chunk.start, "end": chunk.end, "summary": summary}
+            for chunk, summary in zip(chunks, summaries) if summary]
+
+
+# Function to build the summary cache key for a video's chapter list
+def chapters_key(video_id, transcript_text, model_name, max_length, min_length):
+    return summary_key(video_id, transcript_text, f"{model_name}#chapters", max_length, min_length)
+
+
+# Function to look up a video's chapters without loading a model; None if they haven't been made yet
+def cached_chapters(video_id, segments, model_name=None, max_length=SUMMARY_MAX_LENGTH,
+                    min_length=SUMMARY_MIN_LENGTH, cache=summary_cache):
+    text, _ = join_segments(segments)
+    return cache.get(chapters_key(video_id, text, cache_model_name(model_name), max_length, min_length))
+
+
+# Function to get a video's chapters, summarizing (and caching) them on a miss
+def get_chapters(video_id, segments, model_name=None, summarizer=None, max_length=SUMMARY_MAX_LENGTH,
+                 min_length=SUMMARY_MIN_LENGTH, cache=summary_cache):
+    text, _ = join_segments(segments)
+    key = chapters_key(video_id, text, cache_model_name(model_name), max_length, min_length)
+    chapters = cache.get(key)
+    if chapters is None:
+        summarizer = summarizer or get_summarizer(model_name)
+        chapters = summarize_chapters(segments, summarizer, max_length=max_length, min_length=min_length)
+        if chapters:
+            cache.put(key, chapters)
+    return chapters
+
+
+# Function to format seconds as a YouTube-style timestamp (4:05, 1:02:03)
+def format_timestamp(seconds):
+    seconds = int(seconds)
+    hours, rest = divmod(seconds, 3600)
+    minutes, seconds = divmod(rest, 60)
+    return f"{hours}:{minutes:02d}:{seconds:02d}" if hours else f"{minutes}:{seconds:02d}"
+
+
+# Function to build a link that opens the video at a given time
+def chapter_link(video_id, seconds):
+    return f"https://www.youtube.com/watch?v={video_id}&t={int(seconds)}s"
+
+
+# Function to render chapters as Markdown lines with timestamp links
+def chapters_markdown(video_id, chapters):
+    return "\n".join(
+        f"- [{format_timestamp(chapter['start'])} - {format_timestamp(chapter['end'])}]"
+        f"({chapter_link(video_id, chapter['start'])}) {chapter['summary']}"
+        for chapter in chapters
+    )
+
+
+# Function to add a chapter list with timestamp links to an FPDF document
+def add_chapters_to_pdf(pdf, video_id, chapters):
+    pdf.ln(5)
+    pdf.cell(200, 10, txt="Chapters", ln=True)
+    for chapter in chapters:
+        stamp = f"{format_timestamp(chapter['start'])} - {format_timestamp(chapter['end'])}"
+        pdf.set_text_color(0, 0, 255)
+        pdf.cell(0, 8, txt=stamp, ln=True, link=chapter_link(video_id, chapter["start"]))
+        pdf.set_text_color(0, 0, 0)
+        # The core PDF fonts only cover latin-1
+        pdf.multi_cell(0, 8, chapter["summary"].encode('latin-1', 'replace').decode('latin-1'))
@@ -0,0 +1,198 @@
+# chat_cache.py
+# Response cache for the chatbot, so repeated questions don't each cost a paid
+# API call. Exact repeats (the raw question, lowercased with whitespace
+# collapsed) are served from a dict; near-duplicates are found through a small
+# TF-IDF index over word tokens and served when their cosine similarity reaches
+# the threshold and they use the same symbols, so "2+2" never answers "2*2"
+# and "C++" never answers "C". Entries expire
+# after ttl_seconds, the oldest are dropped past max_entries, and users who opt
+# out are never served from or stored in the cache.
+#
+# Settings: CHAT_CACHE_THRESHOLD (0..1, 1 disables near-duplicate matches),
+#           CHAT_CACHE_TTL_SECONDS, CHAT_CACHE_MAX_ENTRIES
+import math
+import os
+import re
+import threading
+import time
+from collections import Counter, OrderedDict, namedtuple
+
+# High because a match serves a stored answer: at 0.85 one changed word in a ten-word question
+# ("ascending" for "descending") still matched
+DEFAULT_THRESHOLD = float(os.environ.get("CHAT_CACHE_THRESHOLD", "0.95"))
+DEFAULT_TTL_SECONDS = int(os.environ.get("CHAT_CACHE_TTL_SECONDS", str(24 * 3600)))
+DEFAULT_MAX_ENTRIES = int(os.environ.get("CHAT_CACHE_MAX_ENTRIES", "5000"))
+# Candidates come from the postings of the query's rarest terms only, skipping terms found
+# in over half the entries; a question close enough to pass the threshold has to share the
+# rare terms, and common words would make every entry a candidate
+CANDIDATE_TERMS = 3
+
+_WORD_RE = re.compile(r"\w+")
+# Symbols that change what a question means (2+2 vs 2*2, C++ vs C#); sentence punctuation isn't one
+_SYMBOL_RE = re.compile(r"[^\w\s.,;:!?'\"()]")
+
+# What lookup returns on a hit: how it matched ("exact" or "similar") and how closely
+CachedResponse = namedtuple("CachedResponse", ["response", "question", "match", "similarity"])
+
+
+# Function to split a question into lowercase word tokens
+def tokenize(text):
+    return _WORD_RE.findall(text.lower())
+
+
+# Function to list the meaningful symbols in a question, in order
+def symbols(text):
+    return _SYMBOL_RE.findall(text)
+
+
+class ChatResponseCache:
+    def __init__(self, threshold=DEFAULT_THRESHOLD, ttl_seconds=DEFAULT_TTL_SECONDS,
+                 max_entries=DEFAULT_MAX_ENTRIES):
+        self.threshold = threshold
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        # key -> (question, response, term counts, created)
+        self._entries = OrderedDict()
+        # term -> keys of the entries containing it, and how many entries contain it
+        self._postings = {}
+        self._opted_out = set()
+        self._lock = threading.Lock()
+        self._counts = Counter()
+        self._lookup_seconds = 0.0
+
+    # Function to build the exact-match key; namespace separates e.g. different system prompts
+    def _key(self, question, namespace):
+        return namespace + "\x00" + " ".join(question.lower().split())
+
+    def _idf(self, term):
+        n = len(self._entries)
+        return math.log((1 + n) / (1 + len(self._postings.get(term, ())))) + 1
+
+    def _weights(self, counts):
+        weights = {term: count * self._idf(term) for term, count in counts.items()}
+        norm = math.sqrt(sum(w * w for w in weights.values()))
+        return weights, norm
+
+    def _remove(self, key):
+        question, response, counts, created = self._entries.pop(key)
+        for term in counts:
+            keys = self._postings.get(term)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._postings[term]
+
+    def _expired(self, created, now):
+        return self.ttl_seconds and now - created > self.ttl_seconds
+
+    def opt_out(self, user):
+        with self._lock:
+            self._opted_out.add(user)
+
+    def opt_in(self, user):
+        with self._lock:
+            self._opted_out.discard(user)
+
+    def is_opted_out(self, user):
+        return user in self._opted_out
+
+    # Function to find a cached response for a question, or None
+    def lookup(self, question, user=None, namespace=""):
+        if user is not None and self.is_opted_out(user):
+            return None
+        start = time.perf_counter()
+        try:
+            with self._lock:
+                return self._lookup(question, namespace)
+        finally:
+            elapsed = time.perf_counter() - start
+            with self._lock:
+                self._lookup_seconds += elapsed
+
+    def _lookup(self, question, namespace):
+        now = time.time()
+        self._counts["lookups"] += 1
+        key = self._key(question, namespace)
+        entry = self._entries.get(key)
+        if entry is not None and self._expired(entry[3], now):
+            self._remove(key)
+            entry = None
+        if entry is not None:
+            self._entries.move_to_end(key)
+            self._counts["exact_hits"] += 1
+            return CachedResponse(entry[1], entry[0], "exact", 1.0)
+
+        if self.threshold < 1.0:
+            counts = Counter(tokenize(question))
+            candidates = set()
+            rarest = sorted((t for t in counts if t in self._postings), key=lambda t: len(self._postings[t]))
+            common = len(self._entries) / 2
+            rare = [term for term in rarest if len(self._postings[term]) <= common] or rarest
+            for term in rare[:CANDIDATE_TERMS]:
+                candidates.update(self._postings.get(term, ()))
+            candidates = [k for k in candidates if k.startswith(namespace + "\x00")]
+            if candidates:
+                query, query_norm = self._weights(counts)
+                query_symbols = symbols(question)
+                best_key, best_score = None, 0.0
+                for candidate in candidates:
+                    stored = self._entries[candidate]
+                    if self._expired(stored[3], now):
+                        self._remove(candidate)
+                        continue
+                    if symbols(stored[0]) != query_symbols:
+                        continue
+                    weights, norm = self._weights(stored[2])
+                    if not norm or not query_norm:
+                        continue
+                    dot = sum(w * weights.get(term, 0.0) for term, w in query.items())
+                    score = dot / (norm * query_norm)
+                    if score > best_score:
+                        best_key, best_score = candidate, score
+                if best_key is not None and best_score >= self.threshold:
+                    stored = self._entries[best_key]
+                    self._entries.move_to_end(best_key)
+                    self._counts["similar_hits"] += 1
+                    return CachedResponse(stored[1], stored[0], "similar", round(best_score, 3))
+
+        self._counts["misses"] += 1
+        return None
+
+    # Function to remember the response to a question
+    def store(self, question, response, user=None, namespace=""):
+        if not response or (user is not None and self.is_opted_out(user)):
+            return
+        key = self._key(question, namespace)
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+            counts = Counter(tokenize(question))
+            self._entries[key] = (question, response, counts, time.time())
+            for term in counts:
+                self._postings.setdefault(term, set()).add(key)
+            while len(self._entries) > self.max_entries:
+                self._remove(next(iter(self._entries)))
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._postings.clear()
+
+    def stats(self):
+        lookups = self._counts["lookups"]
+        saved = self._counts["exact_hits"] + self._counts["similar_hits"]
+        return {
+            "entries": len(self._entries),
+            "lookups": lookups,
+            "exact_hits": self._counts["exact_hits"],
+            "similar_hits": self._counts["similar_hits"],
+            "misses": self._counts["misses"],
+            "saved_calls": saved,
+            "hit_rate": round(saved / lookups, 3) if lookups else 0.0,
+            "avg_lookup_ms": round(self._lookup_seconds / lookups * 1000, 3) if lookups else 0.0,
+            "threshold": self.threshold,
+        }
+
+
+# Shared cache of chatbot responses
+chat_cache = ChatResponseCache()
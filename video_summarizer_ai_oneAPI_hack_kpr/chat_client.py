@@ -0,0 +1,258 @@
+# chat_client.py
+# Client for the chat completion backend (RapidAPI). Keeps a pool of
+# keep-alive connections instead of opening a new TLS connection per message,
+# caps concurrent requests, and retries 429/5xx responses with jittered
+# exponential backoff. Any non-2xx response left after the retries raises
+# ChatAPIError, so an error page is never taken for a reply.
+#
+# CHAT_API_URL points the client somewhere else, e.g. the local stub server:
+#   CHAT_API_URL=http://127.0.0.1:8765/claude3
+import codecs
+import http.client
+import json
+import os
+import queue
+import random
+import threading
+import time
+from urllib.parse import urlsplit
+
+CHAT_API_URL = os.environ.get("CHAT_API_URL", "https://open-ai21.p.rapidapi.com/claude3")
+RAPIDAPI_KEY = os.environ.get("RAPIDAPI_KEY", "b3f00fe5cemshc7eaab2ade19a85p12e03bjsnc5a15b5ce04b")
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+
+class ChatAPIError(Exception):
+    def __init__(self, status, body):
+        super().__init__(f"Chat API returned HTTP {status}: {body[:200]}")
+        self.status = status
+        self.body = body
+
+
+class ChatClient:
+    def __init__(self, url=CHAT_API_URL, api_key=RAPIDAPI_KEY, timeout=30.0, max_retries=3,
+                 backoff_base=0.5, backoff_max=8.0, max_concurrency=8, pool_size=None,
+                 ssl_context=None):
+        parts = urlsplit(url)
+        self.scheme = parts.scheme or "https"
+        self.host = parts.hostname
+        self.port = parts.port
+        self.path = parts.path or "/"
+        self.api_key = api_key
+        self.timeout = timeout
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.pool_size = pool_size or max_concurrency
+        self.ssl_context = ssl_context
+        self._pool = queue.LifoQueue()
+        self._slots = threading.BoundedSemaphore(max_concurrency)
+        self.stats = {"requests": 0, "retries": 0, "connections_opened": 0}
+        self._stats_lock = threading.Lock()
+
+    def _count(self, name):
+        with self._stats_lock:
+            self.stats[name] += 1
+
+    def _headers(self):
+        return {
+            'x-rapidapi-key': self.api_key,
+            'x-rapidapi-host': self.host,
+            'Content-Type': "application/json",
+        }
+
+    # Function to take an idle pooled connection, or open a new one
+    def _acquire(self):
+        try:
+            return self._pool.get_nowait(), True
+        except queue.Empty:
+            pass
+        self._count("connections_opened")
+        if self.scheme == "https":
+            conn = http.client.HTTPSConnection(
+                self.host, self.port, timeout=self.timeout, context=self.ssl_context
+            )
+        else:
+            conn = http.client.HTTPConnection(self.host, self.port, timeout=self.timeout)
+        return conn, False
+
+    def _release(self, conn):
+        if self._pool.qsize() < self.pool_size:
+            self._pool.put(conn)
+        else:
+            conn.close()
+
+    # Function to compute a full-jitter backoff delay, honouring Retry-After when sent
+    def _backoff(self, attempt, retry_after=None):
+        if retry_after:
+            try:
+                return min(float(retry_after), self.backoff_max)
+            except ValueError:
+                pass
+        return random.uniform(0, min(self.backoff_max, self.backoff_base * (2 ** attempt)))
+
+    # Function to send a request, retrying per the retry policy, and return (conn, response).
+    # The caller reads the response body and then hands the connection to _finish.
+    def _send(self, body):
+        attempt = 0
+        while True:
+            conn, reused = self._acquire()
+            try:
+                conn.request("POST", self.path, body, self._headers())
+                res = conn.getresponse()
+            except (http.client.HTTPException, OSError):
+                conn.close()
+                # An idle keep-alive connection closed by the server; retry on a fresh one
+                if reused:
+                    continue
+                if attempt >= self.max_retries:
+                    raise
+                self._count("retries")
+                time.sleep(self._backoff(attempt))
+                attempt += 1
+                continue
+
+            if res.status in RETRY_STATUSES and attempt < self.max_retries:
+                res.read()
+                self._finish(conn, res)
+                self._count("retries")
+                time.sleep(self._backoff(attempt, res.getheader("Retry-After")))
+                attempt += 1
+                continue
+            return conn, res
+
+    # Function to return a fully read connection to the pool (or close it)
+    def _finish(self, conn, res):
+        if res.will_close or not res.isclosed():
+            conn.close()
+        else:
+            self._release(conn)
+
+    # Function to POST a JSON payload and return (status, body text); non-2xx raises ChatAPIError
+    def post(self, payload):
+        # Bytes so http.client sends headers and body in one segment (avoids Nagle delays on reuse)
+        body = json.dumps(payload).encode("utf-8")
+        with self._slots:
+            self._count("requests")
+            conn, res = self._send(body)
+            try:
+                data = res.read()
+            except (http.client.HTTPException, OSError):
+                conn.close()
+                raise
+            self._finish(conn, res)
+            if not 200 <= res.status < 300:
+                raise ChatAPIError(res.status, data.decode("utf-8", "replace"))
+            return res.status, data.decode("utf-8")
+
+    # Function to stream a completion, yielding text pieces as they arrive. Server-sent
+    # events and chunked plain text are read incrementally; a regular JSON response
+    # (backend without streaming) is yielded as a single piece. A non-2xx response left
+    # after retries raises ChatAPIError instead of being yielded as the reply.
+    def stream(self, message, **options):
+        payload = {"messages": [{"role": "user", "content": message}], "web_access": False, "stream": True}
+        payload.update(options)
+        body = json.dumps(payload).encode("utf-8")
+        with self._slots:
+            self._count("requests")
+            conn, res = self._send(body)
+            finished = False
+            try:
+                if not 200 <= res.status < 300:
+                    data = res.read()
+                    finished = True
+                    raise ChatAPIError(res.status, data.decode("utf-8", "replace"))
+                content_type = (res.getheader("Content-Type") or "").split(";")[0].strip().lower()
+                if content_type == "text/event-stream":
+                    yield from _iter_sse(res)
+                elif content_type.startswith("text/"):
+                    decoder = codecs.getincrementaldecoder("utf-8")()
+                    while True:
+                        data = res.read1(1024)
+                        if not data:
+                            break
+                        text = decoder.decode(data)
+                        if text:
+                            yield text
+                else:
+                    text = _extract_text(json.loads(res.read().decode("utf-8")))
+                    if text:
+                        yield text
+                finished = True
+            finally:
+                # A stream abandoned half-way can't be reused for the next request
+                if finished:
+                    self._finish(conn, res)
+                else:
+                    conn.close()
+
+    # Function to get a completion for one user message as the raw JSON response text
+    def complete(self, message, **options):
+        payload = {"messages": [{"role": "user", "content": message}], "web_access": False}
+        payload.update(options)
+        _, text = self.post(payload)
+        return text
+
+    def close(self):
+        while True:
+            try:
+                self._pool.get_nowait().close()
+            except queue.Empty:
+                return
+
+
+# Function to pull the text out of a response or stream event in the shapes backends use
+def _extract_text(data):
+    if isinstance(data, str):
+        return data
+    if not isinstance(data, dict):
+        return ""
+    choices = data.get("choices")
+    if choices:
+        choice = choices[0]
+        return (choice.get("delta") or choice.get("message") or {}).get("content") or choice.get("text") or ""
+    for field in ("delta", "result", "text", "content"):
+        if isinstance(data.get(field), str):
+            return data[field]
+    return ""
+
+
+# Function to yield the text of each server-sent event as it arrives
+def _iter_sse(res):
+    data_lines = []
+    while True:
+        line = res.readline()
+        if not line:
+            break
+        line = line.decode("utf-8").rstrip("\r\n")
+        if line.startswith("data:"):
+            data_lines.append(line[5:].lstrip())
+            continue
+        if line or not data_lines:
+            continue
+        # A blank line ends the event
+        data = "\n".join(data_lines)
+        data_lines = []
+        if data == "[DONE]":
+            break
+        try:
+            text = _extract_text(json.loads(data))
+        except json.JSONDecodeError:
+            text = data
+        if text:
+            yield text
+    # Drain anything left so the connection can be reused
+    res.read()
+
+
+_default_client = None
+_default_lock = threading.Lock()
+
+
+# Function to get the shared client, created once per process
+def get_chat_client():
+    global _default_client
+    with _default_lock:
+        if _default_client is None:
+            _default_client = ChatClient()
+    return _default_client
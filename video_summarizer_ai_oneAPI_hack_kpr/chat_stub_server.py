@@ -0,0 +1,118 @@
+# chat_stub_server.py
+# Local stand-in for the RapidAPI chat endpoint, for benchmarking the chat
+# client without the real service. Speaks HTTP/1.1 keep-alive, answers with
+# the same {"result": ...} JSON shape after a configurable delay, and can be
+# told to fail a fraction of requests with 429/503 to exercise retries.
+# Requests with "stream": true are answered word by word as server-sent events.
+#
+# Usage: python chat_stub_server.py --port 8765 --latency 0.2 --error-rate 0.05
+#        CHAT_API_URL=http://127.0.0.1:8765/claude3 streamlit run app.py
+import argparse
+import json
+import random
+import ssl
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+class StubChatHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True
+    latency = 0.2
+    error_rate = 0.0
+    streaming = True
+    token_delay = 0.02
+
+    def log_message(self, format, *args):
+        pass
+
+    def _send_json(self, status, payload, extra_headers=None):
+        body = json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        for name, value in (extra_headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_POST(self):
+        length = int(self.headers.get("Content-Length", 0))
+        try:
+            request = json.loads(self.rfile.read(length) or b"{}")
+        except json.JSONDecodeError:
+            self._send_json(400, {"error": "invalid JSON"})
+            return
+
+        if random.random() < self.error_rate:
+            status = random.choice([429, 503])
+            self._send_json(status, {"error": "stub failure"}, {"Retry-After": "0"})
+            return
+
+        time.sleep(self.latency)
+        messages = request.get("messages") or [{}]
+        question = messages[-1].get("content", "")
+        answer = f"Stub answer to: {question}"
+        if request.get("stream") and self.streaming:
+            self._send_stream(answer)
+        else:
+            self._send_json(200, {"result": answer})
+
+    # Function to send the answer word by word as server-sent events over chunked encoding
+    def _send_stream(self, answer):
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Transfer-Encoding", "chunked")
+        self.end_headers()
+        words = answer.split(" ")
+        for i, word in enumerate(words):
+            piece = word if i == len(words) - 1 else word + " "
+            self._write_chunk(f"data: {json.dumps({'delta': piece})}\n\n")
+            time.sleep(self.token_delay)
+        self._write_chunk("data: [DONE]\n\n")
+        self.wfile.write(b"0\r\n\r\n")
+
+    def _write_chunk(self, text):
+        data = text.encode("utf-8")
+        self.wfile.write(f"{len(data):x}\r\n".encode("ascii") + data + b"\r\n")
+
+
+# Function to start the stub server in a background thread, returning (server, url)
+def start_stub_server(host="127.0.0.1", port=0, latency=0.2, error_rate=0.0, certfile=None, keyfile=None,
+                      streaming=True, token_delay=0.02):
+    handler = type("ConfiguredStubChatHandler", (StubChatHandler,),
+                   {"latency": latency, "error_rate": error_rate,
+                    "streaming": streaming, "token_delay": token_delay})
+    server = ThreadingHTTPServer((host, port), handler)
+    server.daemon_threads = True
+    scheme = "http"
+    if certfile:
+        context = ssl.SSLContext(ssl.PROTOCOL_TLS_SERVER)
+        context.load_cert_chain(certfile, keyfile)
+        server.socket = context.wrap_socket(server.socket, server_side=True)
+        scheme = "https"
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"{scheme}://{host}:{server.server_address[1]}/claude3"
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Local stub for the chat completion API")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--latency", type=float, default=0.2, help="seconds to wait before answering")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="fraction of requests answered with 429/503")
+    parser.add_argument("--no-stream", action="store_true", help="ignore stream requests and answer buffered JSON")
+    parser.add_argument("--token-delay", type=float, default=0.02, help="seconds between streamed words")
+    parser.add_argument("--certfile", default=None, help="serve HTTPS with this certificate")
+    parser.add_argument("--keyfile", default=None)
+    args = parser.parse_args()
+
+    server, url = start_stub_server(args.host, args.port, args.latency, args.error_rate,
+                                    args.certfile, args.keyfile, not args.no_stream, args.token_delay)
+    print(f"Stub chat API listening on {url}")
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        server.shutdown()
@@ -0,0 +1,108 @@
+# chunker.py
+# Shared transcript chunker. Packs whole sentences into chunks that fit the
+# summarization model's real token budget in a single streaming pass, with
+# optional overlap, and keeps character offsets back into the transcript.
+from collections import deque, namedtuple
+import re
+
+# A chunk of transcript text; start/end are character offsets into the source text
+TextChunk = namedtuple("TextChunk", ["text", "start", "end", "n_tokens"])
+
+# Sentences keep their leading whitespace so token counts match how they appear in context
+_SENTENCE_RE = re.compile(r'\s*[^.!?]*[.!?]+|\s*[^.!?]+')
+_WORD_RE = re.compile(r'\s*\S+')
+
+# Budget used when counting words because no tokenizer was given
+DEFAULT_WORD_BUDGET = 500
+
+
+# Function to work out how many content tokens fit in one model input
+def token_budget(tokenizer=None, max_tokens=None):
+    if tokenizer is None:
+        return max_tokens or DEFAULT_WORD_BUDGET
+    model_limit = tokenizer.model_max_length
+    # Tokenizers without a configured limit report a huge sentinel value
+    if not model_limit or model_limit > 100000:
+        model_limit = 512
+    budget = model_limit - tokenizer.num_special_tokens_to_add()
+    if max_tokens:
+        budget = min(budget, max_tokens)
+    return max(1, budget)
+
+
+# Function to count tokens (or words when no tokenizer is available)
+def count_tokens(text, tokenizer=None):
+    if tokenizer is None:
+        return len(text.split())
+    return len(tokenizer(text, add_special_tokens=False)["input_ids"])
+
+
+# Function to yield (start, end, n_tokens) units no longer than the budget
+def _iter_units(text, tokenizer, budget):
+    for sentence in _SENTENCE_RE.finditer(text):
+        n_tokens = count_tokens(sentence.group(), tokenizer)
+        if n_tokens <= budget:
+            yield sentence.start(), sentence.end(), n_tokens
+            continue
+
+        # Unpunctuated captions can produce one huge "sentence"; fall back to words
+        piece_start = piece_end = sentence.start()
+        piece_tokens = 0
+        for word in _WORD_RE.finditer(sentence.group()):
+            word_start = sentence.start() + word.start()
+            word_end = sentence.start() + word.end()
+            word_tokens = min(count_tokens(word.group(), tokenizer), budget)
+            if piece_tokens and piece_tokens + word_tokens > budget:
+                yield piece_start, piece_end, piece_tokens
+                piece_start, piece_tokens = word_start, 0
+            piece_end = word_end
+            piece_tokens += word_tokens
+        if piece_tokens:
+            yield piece_start, piece_end, piece_tokens
+
+
+# Function to build a chunk from the buffered units, trimming surrounding whitespace
+def _make_chunk(text, units):
+    start, end = units[0][0], units[-1][1]
+    raw = text[start:end]
+    stripped = raw.strip()
+    start += len(raw) - len(raw.lstrip())
+    return TextChunk(stripped, start, start + len(stripped), sum(unit[2] for unit in units))
+
+
+# Function to split text into token-budgeted chunks with offsets
+def iter_chunks(text, tokenizer=None, max_tokens=None, overlap_tokens=0):
+    budget = token_budget(tokenizer, max_tokens)
+    overlap_tokens = min(overlap_tokens, budget // 2)
+
+    units = deque()
+    used = 0
+    fresh = 0  # units added since the last yield, so overlap alone never forms a chunk
+
+    for unit in _iter_units(text, tokenizer, budget):
+        if units and used + unit[2] > budget:
+            if fresh:
+                yield _make_chunk(text, units)
+            # Carry the trailing sentences that fit in the overlap into the next chunk
+            carried = deque()
+            carried_tokens = 0
+            while units and carried_tokens + units[-1][2] <= overlap_tokens:
+                carried.appendleft(units.pop())
+                carried_tokens += carried[0][2]
+            units, used, fresh = carried, carried_tokens, 0
+            # Drop carried context if it leaves no room for the new sentence
+            while units and used + unit[2] > budget:
+                used -= units.popleft()[2]
+        units.append(unit)
+        used += unit[2]
+        fresh += 1
+
+    if units and fresh and text[units[0][0]:units[-1][1]].strip():
+        yield _make_chunk(text, units)
+
+
+# Function to chunk text into smaller pieces, yielding only the text
+def chunk_text(text, max_length=None, tokenizer=None, overlap=0):
+    for chunk in iter_chunks(text, tokenizer, max_tokens=max_length, overlap_tokens=overlap):
+        if chunk.text:
+            yield chunk.text
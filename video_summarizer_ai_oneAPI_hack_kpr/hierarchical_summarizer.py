@@ -0,0 +1,167 @@
+# hierarchical_summarizer.py
+# Map-reduce summarization for long transcripts. The map stage streams chunks
+# through the batched summarizer a window at a time, and the reduce stage
+# re-chunks the joined chunk summaries and summarizes them again until the
+# result fits target_tokens, so multi-hour videos end in a bounded summary.
+from collections import namedtuple
+import math
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+from batch_summarizer import (
+    DEFAULT_BATCH_SIZE, SUMMARY_MAX_LENGTH, SUMMARY_MIN_LENGTH, backend_of, model_name_of,
+    summarize_chunks_batched
+)
+from chunker import chunk_text, count_tokens
+from model_registry import get_summarizer
+from summary_cache import chunk_cache
+
+SUMMARY_TARGET_TOKENS = int(os.environ.get("SUMMARY_TARGET_TOKENS", "600"))
+# Each reduce worker is a separate process holding its own copy of the model and a
+# share of the CPU threads, so one worker per 8 cores (at most 4); 1 turns it off
+DEFAULT_REDUCE_WORKERS = int(os.environ.get(
+    "SUMMARIZER_REDUCE_WORKERS", str(max(1, min(4, (os.cpu_count() or 1) // 8)))
+))
+MAX_REDUCE_LEVELS = 5
+# Map-stage chunks are bucketed by length within a window of this many batches;
+# one batch per window gives streaming callers the most frequent updates
+MAP_WINDOW_BATCHES = int(os.environ.get("SUMMARIZER_MAP_WINDOW_BATCHES", "1"))
+
+# Progress event from iter_hierarchical; done/total count chunks in the map stage
+SummaryUpdate = namedtuple("SummaryUpdate", ["stage", "done", "total", "text"])
+
+_reduce_pool = None
+_reduce_pool_key = None
+
+
+# Function to load the model once inside each reduce worker process (caches are opened there too)
+def _init_reduce_worker(model_name, backend, threads):
+    import torch
+    torch.set_num_threads(threads)
+    get_summarizer(model_name, "cpu", backend)
+
+
+# Function run in a reduce worker: summarize one slice of groups. Caches can't cross processes,
+# so use_cache picks between the worker's own chunk cache and no cache at all.
+def _reduce_worker(model_name, backend, groups, batch_size, max_length, min_length, use_cache):
+    return summarize_chunks_batched(
+        groups, get_summarizer(model_name, "cpu", backend), batch_size=batch_size,
+        max_length=max_length, min_length=min_length, cache=chunk_cache if use_cache else None
+    )
+
+
+# Function to get the process pool for reduce workers, created once per process
+def _get_reduce_pool(model_name, backend, workers):
+    global _reduce_pool, _reduce_pool_key
+    if _reduce_pool is None or _reduce_pool_key != (model_name, backend, workers):
+        if _reduce_pool is not None:
+            _reduce_pool.shutdown()
+        threads = max(1, (os.cpu_count() or 1) // workers)
+        # Spawned, not forked: the parent holds SQLite connections, the preload thread and
+        # torch/OpenMP thread pools, none of which survive a fork safely
+        _reduce_pool = ProcessPoolExecutor(
+            max_workers=workers, mp_context=multiprocessing.get_context("spawn"),
+            initializer=_init_reduce_worker, initargs=(model_name, backend, threads)
+        )
+        _reduce_pool_key = (model_name, backend, workers)
+    return _reduce_pool
+
+
+# Function to summarize one reduce level, split across CPU worker processes when configured
+def _reduce_level(groups, summarizer, workers, batch_size, max_length, min_length, cache):
+    on_cpu = summarizer.model.device.type == "cpu"
+    # Workers only know the shared chunk cache or none; any other cache stays in this process
+    if workers <= 1 or len(groups) < 2 or not on_cpu or cache not in (chunk_cache, None):
+        return summarize_chunks_batched(
+            groups, summarizer, batch_size=batch_size,
+            max_length=max_length, min_length=min_length, cache=cache
+        )
+
+    # Contiguous slices keep the summaries in transcript order when they are joined back
+    workers = min(workers, len(groups))
+    size = math.ceil(len(groups) / workers)
+    slices = [groups[i:i + size] for i in range(0, len(groups), size)]
+    model_name, backend = model_name_of(summarizer), backend_of(summarizer)
+    pool = _get_reduce_pool(model_name, backend, workers)
+    futures = [
+        pool.submit(_reduce_worker, model_name, backend, part, batch_size, max_length, min_length,
+                    cache is not None)
+        for part in slices
+    ]
+    summaries = []
+    for future in futures:
+        summaries.extend(future.result())
+    return summaries
+
+
+# Function to summarize a map window, dropping chunks the model failed on
+def _summarize_window(window, summarizer, batch_size, max_length, min_length, cache, stats):
+    return [s for s in summarize_chunks_batched(
+        window, summarizer, batch_size=batch_size, max_length=max_length,
+        min_length=min_length, cache=cache, stats=stats
+    ) if s]
+
+
+# Function to summarize a stream of chunks, yielding partial summaries as they complete.
+# Yields SummaryUpdate("map", ...) per window of chunk summaries, ("reduce", ...) per
+# reduce level and finally ("done", ...) carrying the full summary.
+def iter_hierarchical(chunks, summarizer=None, target_tokens=SUMMARY_TARGET_TOKENS,
+                      batch_size=DEFAULT_BATCH_SIZE, max_length=SUMMARY_MAX_LENGTH,
+                      min_length=SUMMARY_MIN_LENGTH, reduce_workers=DEFAULT_REDUCE_WORKERS,
+                      cache=chunk_cache, stats=None):
+    summarizer = summarizer or get_summarizer()
+    tokenizer = summarizer.tokenizer
+    total = len(chunks) if hasattr(chunks, "__len__") else None
+
+    # Map: only one window of chunks is held in memory at a time. The first window is a
+    # single chunk so something reaches the screen as early as possible.
+    summaries = []
+    window = []
+    window_size = 1
+    done = 0
+    for chunk in chunks:
+        window.append(chunk)
+        if len(window) >= window_size:
+            partial = _summarize_window(window, summarizer, batch_size, max_length, min_length, cache, stats)
+            summaries.extend(partial)
+            done += len(window)
+            yield SummaryUpdate("map", done, total, ' '.join(partial))
+            window = []
+            window_size = max(1, batch_size) * MAP_WINDOW_BATCHES
+    if window:
+        partial = _summarize_window(window, summarizer, batch_size, max_length, min_length, cache, stats)
+        summaries.extend(partial)
+        done += len(window)
+        yield SummaryUpdate("map", done, total, ' '.join(partial))
+
+    # Reduce: re-chunk and re-summarize until the text fits the target
+    text = ' '.join(summaries)
+    tokens = count_tokens(text, tokenizer)
+    levels = 0
+    while tokens > target_tokens and levels < MAX_REDUCE_LEVELS:
+        groups = list(chunk_text(text, tokenizer=tokenizer))
+        reduced = _reduce_level(
+            groups, summarizer, reduce_workers, batch_size, max_length, min_length, cache
+        )
+        reduced_text = ' '.join(s for s in reduced if s)
+        reduced_tokens = count_tokens(reduced_text, tokenizer)
+        # Stop if a level no longer shrinks the text (e.g. the model failed)
+        if not reduced_text or reduced_tokens >= tokens:
+            break
+        text, tokens = reduced_text, reduced_tokens
+        levels += 1
+        yield SummaryUpdate("reduce", levels, None, text)
+
+    if stats is not None:
+        stats["reduce_levels"] = levels
+        stats["summary_tokens"] = tokens
+    yield SummaryUpdate("done", done, total, text)
+
+
+# Function to summarize a stream of chunks down to roughly target_tokens
+def summarize_hierarchical(chunks, summarizer=None, **kwargs):
+    text = ""
+    for update in iter_hierarchical(chunks, summarizer, **kwargs):
+        text = update.text
+    return text
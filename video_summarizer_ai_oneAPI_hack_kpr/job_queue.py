@@ -0,0 +1,287 @@
+# job_queue.py
+# Local summarization job queue. The Streamlit pages submit (video_id, options)
+# jobs into a SQLite table and poll them by job ID; a separate worker process
+# claims queued jobs, writes progress and partial summaries back as it goes and
+# stores the result, so a browser refresh or a new rerun never loses the work.
+#
+# Run a worker by hand with: python job_queue.py worker
+import hashlib
+import json
+import os
+import sqlite3
+import subprocess
+import sys
+import threading
+import time
+import uuid
+
+from summary_cache import CACHE_DIR
+
+JOBS_PATH = os.path.join(CACHE_DIR, "jobs.sqlite3")
+MAX_PENDING_JOBS = int(os.environ.get("SUMMARY_MAX_PENDING_JOBS", "20"))
+# Running jobs that stop reporting progress for this long are handed to another worker
+STALE_JOB_SECONDS = int(os.environ.get("SUMMARY_STALE_JOB_SECONDS", "900"))
+JOB_RETENTION_SECONDS = 7 * 24 * 3600
+POLL_INTERVAL = 1.0
+
+ACTIVE_STATUSES = ("queued", "running")
+
+
+class QueueFull(Exception):
+    pass
+
+
+_local = threading.local()
+
+
+# Function to open (once per thread) the jobs database
+def _connection():
+    conn = getattr(_local, "conn", None)
+    if conn is None:
+        os.makedirs(CACHE_DIR, exist_ok=True)
+        conn = sqlite3.connect(JOBS_PATH, timeout=30, isolation_level=None)
+        conn.row_factory = sqlite3.Row
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS jobs (
+                id TEXT PRIMARY KEY,
+                dedupe_key TEXT NOT NULL,
+                video_id TEXT NOT NULL,
+                options TEXT NOT NULL,
+                status TEXT NOT NULL,
+                progress REAL NOT NULL DEFAULT 0,
+                partial TEXT,
+                result TEXT,
+                error TEXT,
+                stats TEXT,
+                created REAL NOT NULL,
+                updated REAL NOT NULL
+            )
+        """)
+        conn.execute("CREATE INDEX IF NOT EXISTS jobs_dedupe ON jobs (dedupe_key, status)")
+        conn.execute("CREATE INDEX IF NOT EXISTS jobs_status ON jobs (status, created)")
+        _local.conn = conn
+    return conn
+
+
+# Function to build the key that identifies identical requests
+def job_key(video_id, options):
+    return hashlib.sha256(json.dumps([video_id, options], sort_keys=True).encode("utf-8")).hexdigest()
+
+
+# Function to turn a database row into a plain dict
+def _row_to_job(row):
+    if row is None:
+        return None
+    job = dict(row)
+    job["options"] = json.loads(job["options"])
+    job["stats"] = json.loads(job["stats"]) if job["stats"] else {}
+    return job
+
+
+# Function to queue a summarization job, returning the ID of an identical in-flight job if there is one
+def submit_job(video_id, options=None, max_pending=MAX_PENDING_JOBS):
+    options = options or {}
+    key = job_key(video_id, options)
+    now = time.time()
+    conn = _connection()
+    conn.execute("BEGIN IMMEDIATE")
+    try:
+        row = conn.execute(
+            "SELECT id FROM jobs WHERE dedupe_key = ? AND status IN (?, ?) ORDER BY created LIMIT 1",
+            (key, *ACTIVE_STATUSES),
+        ).fetchone()
+        if row is not None:
+            conn.execute("COMMIT")
+            return row["id"]
+
+        pending = conn.execute("SELECT COUNT(*) FROM jobs WHERE status = 'queued'").fetchone()[0]
+        if pending >= max_pending:
+            raise QueueFull(f"{pending} summarization jobs are already waiting")
+
+        job_id = uuid.uuid4().hex
+        conn.execute(
+            "INSERT INTO jobs (id, dedupe_key, video_id, options, status, created, updated) "
+            "VALUES (?, ?, ?, ?, 'queued', ?, ?)",
+            (job_id, key, video_id, json.dumps(options, sort_keys=True), now, now),
+        )
+        conn.execute(
+            "DELETE FROM jobs WHERE status IN ('done', 'failed') AND updated < ?",
+            (now - JOB_RETENTION_SECONDS,),
+        )
+        conn.execute("COMMIT")
+        return job_id
+    except Exception:
+        conn.execute("ROLLBACK")
+        raise
+
+
+# Function to look up a job by ID
+def get_job(job_id):
+    row = _connection().execute("SELECT * FROM jobs WHERE id = ?", (job_id,)).fetchone()
+    return _row_to_job(row)
+
+
+# Function to count jobs per status
+def queue_stats():
+    rows = _connection().execute("SELECT status, COUNT(*) FROM jobs GROUP BY status").fetchall()
+    return {status: count for status, count in rows}
+
+
+# Function for a worker to atomically take the oldest queued (or abandoned) job
+def claim_next_job():
+    now = time.time()
+    conn = _connection()
+    conn.execute("BEGIN IMMEDIATE")
+    try:
+        conn.execute(
+            "UPDATE jobs SET status = 'queued' WHERE status = 'running' AND updated < ?",
+            (now - STALE_JOB_SECONDS,),
+        )
+        row = conn.execute(
+            "SELECT * FROM jobs WHERE status = 'queued' ORDER BY created LIMIT 1"
+        ).fetchone()
+        if row is not None:
+            conn.execute(
+                "UPDATE jobs SET status = 'running', updated = ? WHERE id = ?", (now, row["id"])
+            )
+        conn.execute("COMMIT")
+    except Exception:
+        conn.execute("ROLLBACK")
+        raise
+    job = _row_to_job(row)
+    if job is not None:
+        job["status"] = "running"
+    return job
+
+
+def update_progress(job_id, progress, partial=None):
+    _connection().execute(
+        "UPDATE jobs SET progress = ?, partial = ?, updated = ? WHERE id = ?",
+        (progress, partial, time.time(), job_id),
+    )
+
+
+# Function to mark a running job as alive without changing its progress, so it isn't treated as stale
+def heartbeat(job_id):
+    _connection().execute("UPDATE jobs SET updated = ? WHERE id = ?", (time.time(), job_id))
+
+
+def finish_job(job_id, result, stats=None):
+    _connection().execute(
+        "UPDATE jobs SET status = 'done', progress = 1, result = ?, stats = ?, updated = ? WHERE id = ?",
+        (result, json.dumps(stats or {}), time.time(), job_id),
+    )
+
+
+def fail_job(job_id, error):
+    _connection().execute(
+        "UPDATE jobs SET status = 'failed', error = ?, updated = ? WHERE id = ?",
+        (error, time.time(), job_id),
+    )
+
+
+# Function to make (or find) a video's timestamped chapters; the page reads them from the summary cache
+def _add_chapters(job, transcript, model_name, max_length, min_length, run_stats):
+    from chapters import get_chapters
+    heartbeat(job["id"])
+    try:
+        chapters = get_chapters(job["video_id"], transcript, model_name,
+                                max_length=max_length, min_length=min_length)
+        run_stats["chapters"] = len(chapters)
+    except Exception as e:
+        print(f"Error making chapters for {job['video_id']}: {str(e)}")
+    heartbeat(job["id"])
+
+
+# Function to summarize one video inside the worker process
+def run_job(job):
+    from batch_summarizer import SUMMARY_MAX_LENGTH, SUMMARY_MIN_LENGTH
+    from chunker import chunk_text
+    from hierarchical_summarizer import SUMMARY_TARGET_TOKENS, iter_hierarchical
+    from model_registry import DEFAULT_MODEL, cache_model_name, get_summarizer, model_stats
+    from summary_cache import summary_cache, summary_key
+    from transcript_store import get_transcript, join_transcript
+
+    options = job["options"]
+    max_length = options.get("max_length", SUMMARY_MAX_LENGTH)
+    min_length = options.get("min_length", SUMMARY_MIN_LENGTH)
+    target_tokens = options.get("target_tokens", SUMMARY_TARGET_TOKENS)
+    model_name = options.get("model", DEFAULT_MODEL)
+
+    transcript = get_transcript(job["video_id"])
+    transcript_text = join_transcript(transcript)
+
+    cache_key = summary_key(job["video_id"], transcript_text, cache_model_name(model_name), max_length, min_length)
+    summary = summary_cache.get(cache_key)
+    if summary is not None:
+        run_stats = {"cached": True}
+        _add_chapters(job, transcript, model_name, max_length, min_length, run_stats)
+        return summary, run_stats
+
+    summarizer = get_summarizer(model_name)
+    chunks = list(chunk_text(transcript_text, tokenizer=summarizer.tokenizer))
+    run_stats = {}
+    partial_summaries = []
+    for update in iter_hierarchical(chunks, summarizer, target_tokens=target_tokens,
+                                    max_length=max_length, min_length=min_length, stats=run_stats):
+        if update.stage == "map":
+            partial_summaries.append(update.text)
+            update_progress(job["id"], update.done / max(1, update.total), ' '.join(partial_summaries))
+        elif update.stage == "reduce":
+            # Reduce levels report no progress of their own; keep the job from looking abandoned
+            heartbeat(job["id"])
+        elif update.stage == "done":
+            summary = update.text
+
+    if summary:
+        summary_cache.put(cache_key, summary)
+        # Chapters reuse the chunk summaries just made, so this is cache hits rather than model work
+        _add_chapters(job, transcript, model_name, max_length, min_length, run_stats)
+    run_stats["models"] = model_stats()
+    return summary, run_stats
+
+
+# Function to process jobs until stopped
+def run_worker(poll_interval=POLL_INTERVAL, once=False):
+    from model_registry import preload_models
+    preload_models()
+    while True:
+        job = claim_next_job()
+        if job is None:
+            if once:
+                return
+            time.sleep(poll_interval)
+            continue
+        try:
+            summary, stats = run_job(job)
+            finish_job(job["id"], summary, stats)
+        except Exception as e:
+            print(f"Error in summarization job {job['id']}: {str(e)}")
+            fail_job(job["id"], str(e))
+
+
+_worker_process = None
+_worker_lock = threading.Lock()
+
+
+# Function to start a background worker process once per Streamlit process
+def start_worker():
+    global _worker_process
+    # Set SUMMARY_WORKER_EXTERNAL=1 when workers are run separately (e.g. under a supervisor)
+    if os.environ.get("SUMMARY_WORKER_EXTERNAL") == "1":
+        return None
+    with _worker_lock:
+        if _worker_process is None or _worker_process.poll() is not None:
+            _worker_process = subprocess.Popen(
+                [sys.executable, os.path.abspath(__file__), "worker"],
+                cwd=os.path.dirname(os.path.abspath(__file__)),
+            )
+    return _worker_process
+
+
+if __name__ == "__main__":
+    if len(sys.argv) > 1 and sys.argv[1] == "worker":
+        run_worker()
+    else:
+        print(queue_stats())
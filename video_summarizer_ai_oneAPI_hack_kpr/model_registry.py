@@ -0,0 +1,186 @@
+# model_registry.py
+# Process-wide registry for summarization models. Streamlit re-executes the
+# page script on every widget interaction, but imported modules stay loaded,
+# so models kept here are built once per process and shared by every session.
+#
+# Backends (SUMMARIZER_BACKEND or the backend argument):
+#   pytorch - fp32 transformers pipeline (default)
+#   int8    - PyTorch dynamic int8 quantization of the Linear layers (CPU)
+#   ipex    - Intel Extension for PyTorch optimized fp32 model (CPU, oneAPI)
+#   onnx    - ONNX Runtime export through optimum (CPU)
+import os
+import sys
+import threading
+import time
+
+DEFAULT_MODEL = os.environ.get("SUMMARIZER_MODEL", "facebook/bart-large-cnn")
+DEFAULT_BACKEND = os.environ.get("SUMMARIZER_BACKEND", "pytorch")
+BACKENDS = ("pytorch", "int8", "ipex", "onnx")
+ONNX_EXPORT_DIR = os.environ.get(
+    "SUMMARIZER_ONNX_DIR", os.path.join(os.path.dirname(os.path.abspath(__file__)), ".cache", "onnx")
+)
+
+_models = {}
+_model_stats = {}
+_lock = threading.Lock()
+
+
+# Function to pick the inference device
+def default_device():
+    import torch
+    return "cuda" if torch.cuda.is_available() else "cpu"
+
+
+# Function to read the resident memory of this process in MB
+def resident_memory_mb():
+    try:
+        import psutil
+        return psutil.Process(os.getpid()).memory_info().rss / (1024 * 1024)
+    except ImportError:
+        pass
+    try:
+        with open("/proc/self/status") as status:
+            for line in status:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    try:
+        import resource
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        # ru_maxrss is reported in bytes on macOS and in KB elsewhere
+        return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+    except ImportError:
+        return None
+
+
+# Function to name a model in cache keys; non-default backends give slightly different output
+def cache_model_name(model_name=None, backend=None):
+    model_name = model_name or DEFAULT_MODEL
+    backend = backend or DEFAULT_BACKEND
+    return model_name if backend == "pytorch" else f"{model_name}+{backend}"
+
+
+# Function to export (once) and load an ONNX Runtime seq2seq model
+def _load_onnx_model(model_name):
+    from optimum.onnxruntime import ORTModelForSeq2SeqLM
+    export_dir = os.path.join(ONNX_EXPORT_DIR, model_name.replace("/", "--"))
+    if os.path.isdir(export_dir):
+        return ORTModelForSeq2SeqLM.from_pretrained(export_dir)
+    model = ORTModelForSeq2SeqLM.from_pretrained(model_name, export=True)
+    model.save_pretrained(export_dir)
+    return model
+
+
+# Function to build a summarization pipeline for the requested backend
+def _load_summarizer(model_name, device, backend):
+    from transformers import AutoTokenizer, pipeline
+
+    if backend not in BACKENDS:
+        raise ValueError(f"Unknown summarizer backend {backend!r}, expected one of {BACKENDS}")
+    if backend != "pytorch" and device != "cpu":
+        raise ValueError(f"The {backend} backend only runs on CPU")
+
+    if backend == "onnx":
+        tokenizer = AutoTokenizer.from_pretrained(model_name)
+        summarizer = pipeline("summarization", model=_load_onnx_model(model_name), tokenizer=tokenizer)
+    else:
+        summarizer = pipeline("summarization", model=model_name, device=device)
+
+    if backend == "int8":
+        import torch
+        summarizer.model = torch.quantization.quantize_dynamic(
+            summarizer.model, {torch.nn.Linear}, dtype=torch.qint8
+        )
+    elif backend == "ipex":
+        import intel_extension_for_pytorch as ipex
+        summarizer.model = ipex.optimize(summarizer.model.eval())
+
+    summarizer.backend = backend
+    return summarizer
+
+
+# Function to get a summarizer, loading it only the first time it is requested
+def get_summarizer(model_name=None, device=None, backend=None):
+    model_name = model_name or DEFAULT_MODEL
+    backend = backend or DEFAULT_BACKEND
+    device = device or ("cpu" if backend != "pytorch" else default_device())
+    key = (model_name, device, backend)
+
+    summarizer = _models.get(key)
+    if summarizer is not None:
+        return summarizer
+
+    with _lock:
+        # Another thread may have finished loading while we waited
+        summarizer = _models.get(key)
+        if summarizer is not None:
+            return summarizer
+
+        rss_before = resident_memory_mb()
+        start = time.perf_counter()
+        summarizer = _load_summarizer(model_name, device, backend)
+        load_seconds = time.perf_counter() - start
+        rss_after = resident_memory_mb()
+
+        _models[key] = summarizer
+        _model_stats[key] = {
+            "model": model_name,
+            "device": device,
+            "backend": backend,
+            "load_seconds": round(load_seconds, 3),
+            "rss_mb": round(rss_after, 1) if rss_after is not None else None,
+            "rss_delta_mb": round(rss_after - rss_before, 1)
+            if rss_before is not None and rss_after is not None else None,
+            "loaded_at": time.time(),
+        }
+        print(f"Loaded summarizer {model_name} ({backend}) on {device} in {load_seconds:.1f}s")
+        return summarizer
+
+
+# Function to load models ahead of the first request
+def preload_models(model_names=None, device=None):
+    if model_names is None:
+        env_models = os.environ.get("SUMMARIZER_PRELOAD", "")
+        model_names = [name.strip() for name in env_models.split(",") if name.strip()] or [DEFAULT_MODEL]
+    for model_name in model_names:
+        get_summarizer(model_name, device)
+    return model_stats()
+
+
+# Function to start preloading in a daemon thread, once per process
+_preload_thread = None
+
+
+def preload_in_background(model_names=None, device=None):
+    global _preload_thread
+    with _lock:
+        if _preload_thread is None:
+            _preload_thread = threading.Thread(
+                target=preload_models, args=(model_names, device), daemon=True
+            )
+            _preload_thread.start()
+    return _preload_thread
+
+
+# Function to report load time and memory for every loaded model
+def model_stats():
+    stats = [dict(entry) for entry in _model_stats.values()]
+    current_rss = resident_memory_mb()
+    for entry in stats:
+        entry["process_rss_mb"] = round(current_rss, 1) if current_rss is not None else None
+    return stats
+
+
+# Function to check whether a model is already warm
+def is_loaded(model_name=None, device=None, backend=None):
+    model_name = model_name or DEFAULT_MODEL
+    backend = backend or DEFAULT_BACKEND
+    device = device or ("cpu" if backend != "pytorch" else default_device())
+    return (model_name, device, backend) in _models
+
+
+if __name__ == "__main__":
+    # Download and time the default models, e.g. `python model_registry.py facebook/bart-large-cnn`
+    for entry in preload_models(sys.argv[1:] or None):
+        print(entry)
@@ -0,0 +1,159 @@
+# moderation.py
+# Keyword moderation for chat messages. All keyword lists (the violation
+# categories below and LSTM_CHATBOT/vulgar_words.csv) are compiled into one
+# case-insensitive regex with word boundaries, so a message is scanned once
+# and every matching category is reported with its risk level. The keywords
+# are laid out as a trie inside the regex so shared prefixes are matched once.
+#
+# In vulgar_words.csv a "*" masks one letter ("sh*t"): it matches any letter or
+# a masking symbol typed by the user, except ordinary words that share the
+# mask (ALLOWED_WORDS, e.g. "shot", "duck", "where").
+import csv
+import os
+import re
+
+MODULE_DIR = os.path.dirname(os.path.abspath(__file__))
+VULGAR_WORDS_PATH = os.path.join(MODULE_DIR, "LSTM_CHATBOT", "vulgar_words.csv")
+
+# Violation categories checked in the chatbot
+violations = [
+    {"keywords": ["harm", "hurt", "kill", "abuse", "violence"], "description": "Harmful content", "risk_level": 5},
+    {"keywords": ["age", "disability", "manipulate", "exploit"], "description": "Exploiting vulnerabilities (age, disability)", "risk_level": 4},
+    {"keywords": ["subliminal", "manipulative"], "description": "Subliminal techniques to impair decision-making", "risk_level": 3},
+    {"keywords": ["threat", "intimidation"], "description": "Threatening behavior", "risk_level": 4},
+    {"keywords": ["racism", "sexism", "discrimination"], "description": "Discriminatory language", "risk_level": 4},
+    {"keywords": ["assault", "harassment", "abduction"], "description": "Harassment or assault", "risk_level": 5},
+]
+
+VULGAR_DESCRIPTION = "Vulgar or abusive language"
+VULGAR_RISK_LEVEL = 3
+
+# Everyday words that a masked entry would otherwise match
+ALLOWED_WORDS = {
+    "shot", "shut", "batch", "botch", "butch", "deck", "dock", "duck", "duckweed", "twit",
+    "cant", "cent", "sacks", "sicks", "socks", "nagger", "chunk", "pike", "poke", "puke",
+    "spec", "wag", "wig", "fig", "fog", "dike", "duke", "scut", "where",
+}
+
+# Letters, digits or symbols people type in place of a masked letter
+_MASK = r"[a-z0-9*@#$%!]"
+# Inflections of single-word keywords ("hurting", "threatened", "killer", "harmful")
+_SUFFIX = r"(?:s|es|d|ed|ing|er|ers|ful|en|ens|ened|ening)?"
+
+
+# Function to read the vulgar word list
+def load_vulgar_words(path=VULGAR_WORDS_PATH):
+    with open(path, encoding="utf-8", newline="") as f:
+        return [row["vulgar_words"].strip() for row in csv.DictReader(f) if row["vulgar_words"].strip()]
+
+
+# Function to build the violation category for the vulgar word list
+def vulgar_category(path=VULGAR_WORDS_PATH):
+    return {"keywords": load_vulgar_words(path), "description": VULGAR_DESCRIPTION,
+            "risk_level": VULGAR_RISK_LEVEL}
+
+
+# Function to split a keyword or phrase into regex atoms: one per character, whitespace or suffix
+def keyword_atoms(keyword):
+    words = keyword.lower().split()
+    atoms = []
+    for i, word in enumerate(words):
+        if i:
+            atoms.append(r"\s+")
+        atoms.extend(_MASK if char == "*" else re.escape(char) for char in word)
+    if len(words) == 1 and "*" not in keyword:
+        atoms.append(_SUFFIX)
+    return atoms
+
+
+# Function to wrap a regex fragment in word boundaries that also treat "*" as part of a word
+def bounded(pattern):
+    return r"(?<![\w*])(?:" + pattern + r")(?![\w*])"
+
+
+# Function to build a regex for a trie of atoms; shared prefixes are matched once,
+# and longer keywords are tried before the keywords they extend
+def _trie_regex(node):
+    # The optional suffix can match nothing, so it goes last or it would cut "kill yourself" short
+    atoms = sorted((atom for atom in node if atom), key=lambda atom: (atom == _SUFFIX, atom))
+    branches = [atom + _trie_regex(node[atom]) for atom in atoms]
+    if not branches:
+        return ""
+    body = branches[0] if len(branches) == 1 else "(?:" + "|".join(branches) + ")"
+    if "" in node:
+        return "(?:" + body + ")?" if len(branches) == 1 else body + "?"
+    return body
+
+
+# Function to compile keywords into one pattern (a regex alternation of 80 keywords tries every
+# keyword at every word; the trie form only follows the branches that share a prefix)
+def compile_keywords(keywords):
+    root = {}
+    for keyword in keywords:
+        node = root
+        for atom in keyword_atoms(keyword):
+            node = node.setdefault(atom, {})
+        node[""] = {}
+    return re.compile(bounded(_trie_regex(root)), re.IGNORECASE)
+
+
+class Moderator:
+    def __init__(self, categories):
+        self.categories = categories
+        self._keywords = {}
+        for index, category in enumerate(categories):
+            for keyword in category["keywords"]:
+                self._keywords.setdefault(keyword.lower(), set()).add(index)
+        self._keyword_patterns = {
+            keyword: re.compile(bounded("".join(keyword_atoms(keyword))), re.IGNORECASE)
+            for keyword in self._keywords
+        }
+        self.pattern = compile_keywords(self._keywords)
+        # Matched term -> category indexes, filled as terms are seen
+        self._term_categories = {}
+
+    # Function to find the categories of a matched term. Every keyword inside the term counts,
+    # so "kill yourself" also reports the categories listing plain "kill".
+    def _categories_for(self, term):
+        indexes = self._term_categories.get(term)
+        if indexes is None:
+            indexes = set()
+            for keyword, pattern in self._keyword_patterns.items():
+                if pattern.search(term):
+                    indexes |= self._keywords[keyword]
+            if len(self._term_categories) > 10000:
+                self._term_categories.clear()
+            self._term_categories[term] = indexes
+        return indexes
+
+    # Function to list every category the text violates (highest risk first), with the matched terms
+    def scan(self, text):
+        found = {}
+        for match in self.pattern.finditer(text):
+            term = match.group().lower()
+            if term in ALLOWED_WORDS:
+                continue
+            for index in self._categories_for(term):
+                found.setdefault(index, []).append(term)
+        results = []
+        for index, terms in found.items():
+            category = self.categories[index]
+            results.append({"description": category["description"], "risk_level": category["risk_level"],
+                            "matches": sorted(set(terms))})
+        results.sort(key=lambda result: result["risk_level"], reverse=True)
+        return results
+
+    # Function to get the highest risk level in the text (0 when clean)
+    def risk_level(self, text):
+        results = self.scan(text)
+        return results[0]["risk_level"] if results else 0
+
+
+# Shared moderator over every keyword list, and one for the vulgar word list alone
+moderator = Moderator(violations + [vulgar_category()])
+vulgar_moderator = Moderator([vulgar_category()])
+
+
+# Function to check a message against all categories; returns the list of violations (empty when clean)
+def check_message(message):
+    return moderator.scan(message or "")
@@ -1,15 +1,19 @@
-import http.client
 import streamlit as st
-from youtube_transcript_api import YouTubeTranscriptApi
-from transformers import pipeline
+from app_cache import (cached_translation, cached_translations, fetch_transcript, forget_video,
+                       get_cached_chat_client, get_tts_engine, video_summary_key)
+from batch_summarizer import SUMMARY_MAX_LENGTH, SUMMARY_MIN_LENGTH
+from chapters import add_chapters_to_pdf, chapters_markdown, get_chapters
+from model_registry import get_summarizer, preload_in_background, model_stats
+from hierarchical_summarizer import iter_hierarchical
+from chunker import chunk_text
 from fpdf import FPDF
-from googletrans import Translator
+from chat_client import ChatAPIError
+from summary_cache import summary_cache
+from transcript_store import join_transcript
 import json
-import pyttsx3
 
-# Set up the translator and text-to-speech engine
-translator = Translator()
-tts_engine = pyttsx3.init()
+# Warm the summarization model once per process so the first summary doesn't pay the load
+preload_in_background()
 
 # Function to extract video ID from link
 def extract_video_id(link):
@@ -22,51 +26,30 @@ def extract_video_id(link):
         print(f"Error extracting video ID: {str(e)}")
         return None
 
-# Function to get ChatGPT response
+# Function to get ChatGPT response (pooled keep-alive client with retries, see chat_client.py)
 def get_chatgpt_response(message):
-    conn = http.client.HTTPSConnection("open-ai21.p.rapidapi.com")
-    payload = json.dumps({
-        "messages": [{"role": "user", "content": message}],
-        "web_access": False
-    })
-    headers = {
-        'x-rapidapi-key': "b3f00fe5cemshc7eaab2ade19a85p12e03bjsnc5a15b5ce04b",
-        'x-rapidapi-host': "open-ai21.p.rapidapi.com",
-        'Content-Type': "application/json"
-    }
-    conn.request("POST", "/claude3", payload, headers)
-    res = conn.getresponse()
-    data = res.read()
-    return data.decode("utf-8")
-
-# Function to translate text
-def translate_text(text, lang):
-    result = translator.translate(text, dest=lang)
-    return result.text
+    return get_cached_chat_client().complete(message)
 
 # Function to generate PDF
-def generate_pdf(summary_text):
+def generate_pdf(summary_text, chapters=None, video_id=None):
     pdf = FPDF()
     pdf.add_page()
     pdf.set_font("Arial", size=12)
     pdf.cell(200, 10, txt="YouTube Video Summary", ln=True, align="C")
     pdf.multi_cell(0, 10, summary_text)
+    if chapters and video_id:
+        add_chapters_to_pdf(pdf, video_id, chapters)
     pdf_file = "summary.pdf"
     pdf.output(pdf_file)
     return pdf_file
 
 # Function to speak text
 def speak_text(text):
+    tts_engine = get_tts_engine()
     tts_engine.setProperty('rate', 150)  # Speed of speech
     tts_engine.say(text)
     tts_engine.runAndWait()
 
-# Function to chunk text into smaller pieces
-def chunk_text(text, max_length=1024):
-    words = text.split()
-    for i in range(0, len(words), max_length):
-        yield ' '.join(words[i:i+max_length])
-
 # Available languages for translation
 languages = {
     'English': 'en',
@@ -93,28 +76,59 @@ if option == "YouTube Summarizer":
     # Main content logic for summarization
     video_id = extract_video_id(youtube_link)
     if video_id:
+        # Drop this video's cached transcript and summary and start over
+        if st.sidebar.button("Refresh summary"):
+            forget_video(video_id, SUMMARY_MAX_LENGTH, SUMMARY_MIN_LENGTH)
+            st.experimental_rerun()
+
         try:
-            # Get video transcript
-            transcript = YouTubeTranscriptApi.get_transcript(video_id)
+            # Get video transcript (cached per video ID across reruns)
+            transcript = fetch_transcript(video_id)
 
             # Convert transcript to text
-            transcript_text = ' '.join([t['text'] for t in transcript])
+            transcript_text = join_transcript(transcript)
 
-            # Summarize transcript in chunks
-            summarizer = pipeline("summarization")
-            chunked_texts = list(chunk_text(transcript_text, max_length=400))  # Chunk transcript into 400-word pieces
-            summaries = [summarizer(chunk, max_length=150, min_length=50, do_sample=False)[0]['summary_text'] for chunk in chunked_texts]
-            
-            # Join all chunked summaries
-            full_summary = ' '.join(summaries)
-
-            # Display full summary in original language (English)
+            # Reruns for the same video reuse the finished summary instead of summarizing again
             st.write("Summary of the video:")
-            st.write(full_summary)
+            cache_key = video_summary_key(video_id, transcript_text, SUMMARY_MAX_LENGTH, SUMMARY_MIN_LENGTH)
+            full_summary = summary_cache.get(cache_key)
+            if full_summary is not None:
+                st.write(full_summary)
+            else:
+                # Summarize transcript in chunks
+                summarizer = get_summarizer()
+                chunked_texts = list(chunk_text(transcript_text, tokenizer=summarizer.tokenizer))  # Chunk transcript to the model's token budget
+
+                # Display chunk summaries as they complete, then the reduced full summary (English)
+                summary_placeholder = st.empty()
+                progress_bar = st.progress(0.0)
+                partial_summaries = []
+                full_summary = ""
+                for update in iter_hierarchical(chunked_texts, summarizer,
+                                                max_length=SUMMARY_MAX_LENGTH, min_length=SUMMARY_MIN_LENGTH):
+                    if update.stage == "map":
+                        partial_summaries.append(update.text)
+                        summary_placeholder.write(' '.join(partial_summaries))
+                        progress_bar.progress(min(1.0, update.done / max(1, update.total)))
+                    elif update.stage == "done":
+                        full_summary = update.text
+                progress_bar.empty()
+                summary_placeholder.write(full_summary)
+                if full_summary:
+                    summary_cache.put(cache_key, full_summary)
+
+            # One timestamped chapter per chunk; the chunk summaries are already cached by the summary above
+            chapters = get_chapters(video_id, transcript, max_length=SUMMARY_MAX_LENGTH, min_length=SUMMARY_MIN_LENGTH)
+            if chapters:
+                st.write("Chapters:")
+                st.markdown(chapters_markdown(video_id, chapters))
+
+            with st.sidebar.expander("Summarizer model"):
+                st.json(model_stats())
 
             # Translate summary to the selected language
             selected_language = st.sidebar.selectbox("Select language for translation:", list(languages.keys()))
-            translated_summary = translator.translate(full_summary, dest=languages[selected_language]).text
+            translated_summary = cached_translation(full_summary, languages[selected_language])
 
             # Display translated summary
             st.write(f"Translated Summary in {selected_language}:")
@@ -126,7 +140,7 @@ if option == "YouTube Summarizer":
 
             # Sidebar button to download the summary as PDF
             if st.sidebar.button("Download Summary as PDF"):
-                pdf_file = generate_pdf(translated_summary)
+                pdf_file = generate_pdf(translated_summary, chapters, video_id)
                 with open(pdf_file, "rb") as file:
                     st.sidebar.download_button(
                         label="Download PDF",
@@ -145,21 +159,25 @@ elif option == "Chatbot":
 
     message = st.text_input("You : ")
     if st.button("Send"):
-        response = get_chatgpt_response(message)
-        response_json = json.loads(response)
-        chatgpt_response = response_json.get("result", "No response from ChatGPT.")
-        st.write("ChatGPT: " + chatgpt_response)
-
-        col1, col2, col3 = st.columns(3)
-        with col1:
-            if st.button("Telugu"):
-                telugu_response = translate_text(chatgpt_response, 'te')
-                st.write("Telugu: " + telugu_response)
-        with col2:
-            if st.button("Tamil"):
-                tamil_response = translate_text(chatgpt_response, 'ta')
-                st.write("Tamil: " + tamil_response)
-        with col3:
-            if st.button("Hindi"):
-                hindi_response = translate_text(chatgpt_response, 'hi')
-                st.write("Hindi: " + hindi_response)
+        try:
+            response = get_chatgpt_response(message)
+            chatgpt_response = json.loads(response).get("result")
+        except (ChatAPIError, json.JSONDecodeError) as e:
+            print(f"Error getting chat response: {str(e)}")
+            st.error("The chat service is unavailable right now. Please try again later.")
+        else:
+            if not chatgpt_response:
+                st.write("ChatGPT: No response from ChatGPT.")
+            else:
+                st.write("ChatGPT: " + chatgpt_response)
+
+                # Translate into all three languages at once instead of one button press at a time
+                reply_languages = {'Telugu': 'te', 'Tamil': 'ta', 'Hindi': 'hi'}
+                try:
+                    translations = cached_translations(chatgpt_response, tuple(reply_languages.values()))
+                    for column, (name, code) in zip(st.columns(3), reply_languages.items()):
+                        with column:
+                            st.write(f"{name}: " + translations[code])
+                except Exception as e:
+                    print(f"Error translating response: {str(e)}")
+                    st.write("Error translating the response.")
@@ -0,0 +1,151 @@
+# summary_cache.py
+# Disk-backed, content-addressed cache for summaries. Entries live in SQLite
+# (WAL mode) so they survive restarts and are shared by every Streamlit worker
+# on the machine; the least recently used entries are evicted past max_entries
+# and anything older than ttl_seconds is treated as a miss.
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+
+CACHE_DIR = os.environ.get(
+    "SUMMARIZER_CACHE_DIR", os.path.join(os.path.dirname(os.path.abspath(__file__)), ".cache")
+)
+DEFAULT_CACHE_PATH = os.path.join(CACHE_DIR, "summaries.sqlite3")
+DEFAULT_MAX_ENTRIES = int(os.environ.get("SUMMARY_CACHE_MAX_ENTRIES", "2000"))
+DEFAULT_CHUNK_MAX_ENTRIES = int(os.environ.get("CHUNK_CACHE_MAX_ENTRIES", "50000"))
+DEFAULT_TTL_SECONDS = int(os.environ.get("SUMMARY_CACHE_TTL_SECONDS", str(30 * 24 * 3600)))
+
+
+# Function to hash text for use in cache keys
+def text_hash(text):
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+# Function to get this thread's WAL-mode connection to a SQLite file, opening it on first use.
+# sqlite3 connections can't be shared across threads, so each thread keeps its own in local.
+def thread_connection(local, path):
+    conn = getattr(local, "conn", None)
+    if conn is None:
+        conn = sqlite3.connect(path, timeout=30)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        local.conn = conn
+    return conn
+
+
+# Function to normalize chunk text so whitespace-only differences share a cache entry
+def normalize_text(text):
+    return " ".join(text.split())
+
+
+# Function to build the cache key for a single chunk summary
+def chunk_key(chunk, model_name, max_length, min_length):
+    parts = [text_hash(normalize_text(chunk)), model_name, max_length, min_length]
+    return hashlib.sha256(json.dumps(parts).encode("utf-8")).hexdigest()
+
+
+# Function to build the cache key for a video summary
+def summary_key(video_id, transcript_text, model_name, max_length, min_length):
+    parts = [video_id, text_hash(transcript_text), model_name, max_length, min_length]
+    return hashlib.sha256(json.dumps(parts).encode("utf-8")).hexdigest()
+
+
+class DiskLRUCache:
+    def __init__(self, path=DEFAULT_CACHE_PATH, table="summaries",
+                 max_entries=DEFAULT_MAX_ENTRIES, ttl_seconds=DEFAULT_TTL_SECONDS):
+        self.path = path
+        self.table = table
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.hits = 0
+        self.misses = 0
+        self._local = threading.local()
+        self._stats_lock = threading.Lock()
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        with self._connection() as conn:
+            conn.execute(f"""
+                CREATE TABLE IF NOT EXISTS {table} (
+                    key TEXT PRIMARY KEY,
+                    value TEXT NOT NULL,
+                    created REAL NOT NULL,
+                    accessed REAL NOT NULL
+                )
+            """)
+            conn.execute(f"CREATE INDEX IF NOT EXISTS {table}_accessed ON {table} (accessed)")
+
+    def _connection(self):
+        return thread_connection(self._local, self.path)
+
+    def _count(self, hit):
+        with self._stats_lock:
+            if hit:
+                self.hits += 1
+            else:
+                self.misses += 1
+
+    def get(self, key, default=None):
+        now = time.time()
+        conn = self._connection()
+        row = conn.execute(
+            f"SELECT value, created FROM {self.table} WHERE key = ?", (key,)
+        ).fetchone()
+        if row is None or (self.ttl_seconds and now - row[1] > self.ttl_seconds):
+            if row is not None:
+                with conn:
+                    conn.execute(f"DELETE FROM {self.table} WHERE key = ?", (key,))
+            self._count(False)
+            return default
+        with conn:
+            conn.execute(f"UPDATE {self.table} SET accessed = ? WHERE key = ?", (now, key))
+        self._count(True)
+        return json.loads(row[0])
+
+    def put(self, key, value):
+        now = time.time()
+        with self._connection() as conn:
+            conn.execute(
+                f"INSERT OR REPLACE INTO {self.table} (key, value, created, accessed) VALUES (?, ?, ?, ?)",
+                (key, json.dumps(value), now, now),
+            )
+        self.evict()
+
+    def delete(self, key):
+        with self._connection() as conn:
+            conn.execute(f"DELETE FROM {self.table} WHERE key = ?", (key,))
+
+    def evict(self):
+        with self._connection() as conn:
+            if self.ttl_seconds:
+                conn.execute(
+                    f"DELETE FROM {self.table} WHERE created < ?", (time.time() - self.ttl_seconds,)
+                )
+            if self.max_entries:
+                conn.execute(f"""
+                    DELETE FROM {self.table} WHERE key IN (
+                        SELECT key FROM {self.table} ORDER BY accessed DESC LIMIT -1 OFFSET ?
+                    )
+                """, (self.max_entries,))
+
+    def clear(self):
+        with self._connection() as conn:
+            conn.execute(f"DELETE FROM {self.table}")
+
+    def stats(self):
+        entries = self._connection().execute(f"SELECT COUNT(*) FROM {self.table}").fetchone()[0]
+        lookups = self.hits + self.misses
+        return {
+            "entries": entries,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 3) if lookups else 0.0,
+        }
+
+
+# Shared cache of full video summaries
+summary_cache = DiskLRUCache()
+
+# Shared cache of per-chunk summaries, so unchanged or repeated chunks skip the model
+chunk_cache = DiskLRUCache(table="chunk_summaries", max_entries=DEFAULT_CHUNK_MAX_ENTRIES)
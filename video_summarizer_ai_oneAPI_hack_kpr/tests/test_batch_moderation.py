@@ -0,0 +1,17 @@
+# tests/test_batch_moderation.py
+# Bulk screening reads odd JSONL records without stopping the run.
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from batch_moderation import moderate_stream, read_messages  # noqa: E402
+
+
+def test_null_numeric_and_structured_texts(capsys):
+    lines = ['{"id": "a", "text": null}\n', '{"id": "b", "text": 42}\n', '{"id": "c"}\n',
+             '{"id": "d", "text": ["x"]}\n', 'plain message\n']
+    messages = list(read_messages(lines))
+    assert messages == [("a", ""), ("b", "42"), ("c", ""), (5, "plain message")]
+    assert "line 4" in capsys.readouterr().err
+    assert [record["id"] for record in moderate_stream(messages, workers=1)] == ["a", "b", "c", 5]
@@ -0,0 +1,41 @@
+# tests/test_chat_cache.py
+# Questions that differ only in symbols must not share cached answers.
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from chat_cache import ChatResponseCache  # noqa: E402
+
+
+def test_exact_key_keeps_symbols():
+    cache = ChatResponseCache()
+    cache.store("what is 2+2", "4")
+    cache.store("C vs C", "the same language")
+    assert cache.lookup("what is 2*2") is None
+    assert cache.lookup("What is 2-2?") is None
+    assert cache.lookup("C++ vs C#") is None
+
+
+def test_case_and_whitespace_still_match_exactly():
+    cache = ChatResponseCache()
+    cache.store("what is 2+2", "4")
+    hit = cache.lookup("  What   is 2+2 ")
+    assert hit.match == "exact"
+    assert hit.response == "4"
+
+
+def test_sentence_punctuation_still_matches_as_similar():
+    cache = ChatResponseCache()
+    cache.store("what is 2+2", "4")
+    hit = cache.lookup("What is 2+2?")
+    assert hit.match == "similar"
+    assert hit.response == "4"
+
+
+def test_one_changed_word_is_not_a_match():
+    cache = ChatResponseCache()
+    cache.store("how to sort a list in python in descending order", "sorted(items, reverse=True)")
+    assert cache.lookup("how to sort a list in python in ascending order") is None
+    hit = cache.lookup("How to sort a list in Python in descending order?")
+    assert hit.response == "sorted(items, reverse=True)"
@@ -0,0 +1,86 @@
+# tests/test_translation.py
+# Sentence-level translation caching: a text that shares most of its
+# sentences with an earlier one only sends the new sentences.
+import os
+import sys
+import tempfile
+
+PROJECT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, PROJECT_DIR)
+# Keep the module-level caches out of the project's .cache directory
+os.environ.setdefault("SUMMARIZER_CACHE_DIR", tempfile.mkdtemp(prefix="translation-test-"))
+
+from translation import (  # noqa: E402
+    MAX_SEGMENT_CHARS, StubTranslateBackend, TranslationCache, pack_requests, split_sentences, translate_text
+)
+
+
+class RecordingBackend(StubTranslateBackend):
+    def __init__(self):
+        super().__init__()
+        self.requests = []
+
+    async def translate(self, text, dest):
+        self.requests.append(text)
+        return await super().translate(text, dest)
+
+
+TEXT_A = "The cell makes energy. Plants use light. Water moves up the stem. Roots hold the soil."
+TEXT_B = "The cell makes energy. Plants use light. Water moves up the stem. Leaves fall in autumn."
+
+
+def test_shared_sentences_are_reused():
+    cache = TranslationCache(disk=None)
+    backend = RecordingBackend()
+
+    translate_text(TEXT_A, "fr", backend=backend, cache=cache)
+    assert backend.calls == 1
+
+    translated = translate_text(TEXT_B, "fr", backend=backend, cache=cache)
+    # Only the one new sentence goes to the backend
+    assert backend.calls == 2
+    assert backend.requests[-1] == "Leaves fall in autumn."
+    assert cache.stats()["memory_hits"] == 3
+    assert translated == ("[fr] The cell makes energy. [fr] Plants use light. "
+                          "[fr] Water moves up the stem. [fr] Leaves fall in autumn.")
+
+
+def test_repeat_is_served_from_cache():
+    cache = TranslationCache(disk=None)
+    backend = RecordingBackend()
+    first = translate_text(TEXT_A, "hi", backend=backend, cache=cache)
+    second = translate_text(TEXT_A, "hi", backend=backend, cache=cache)
+    assert first == second
+    assert backend.calls == 1
+
+
+def test_misses_are_packed_into_bounded_requests():
+    sentences = [f"Sentence number {i} is here." for i in range(1000)]
+    requests = pack_requests(sentences)
+    assert len(requests) > 1
+    assert all(len("\n".join(request)) <= MAX_SEGMENT_CHARS for request in requests)
+    assert [sentence for request in requests for sentence in request] == sentences
+
+
+def test_long_sentences_are_cut_to_the_limit():
+    text = "word " * 2000 + "end."
+    pieces = split_sentences(text)
+    assert all(len(sentence) <= MAX_SEGMENT_CHARS for sentence, _ in pieces)
+    assert "".join(sentence + separator for sentence, separator in pieces) == text
+
+
+class IdentityBackend(RecordingBackend):
+    async def translate(self, text, dest):
+        self.requests.append(text)
+        return text
+
+
+def test_decimals_abbreviations_and_newlines_survive():
+    text = ("The U.S. economy grew 3.5%… Details are on example.com today.\n"
+            "- first point\n- second point\n\nThanks!")
+    backend = IdentityBackend()
+    assert translate_text(text, "fr", backend=backend, cache=TranslationCache(disk=None)) == text
+    sentences = backend.requests[0].split("\n")
+    assert "The U.S. economy grew 3.5%…" in sentences
+    assert "Details are on example.com today." in sentences
+    assert "- second point" in sentences
@@ -0,0 +1,49 @@
+# tests/test_user_store.py
+# Accounts on the SQLite backend: hashing, re-hashing and the username index.
+import os
+import sqlite3
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from user_store import SQLiteUserStore, UserStoreError, hash_password  # noqa: E402
+
+
+def test_register_and_login(tmp_path):
+    store = SQLiteUserStore(str(tmp_path / "users.sqlite3"), iterations=1000)
+    assert store.register_user("ada", "secret")
+    assert not store.register_user("ada", "other")
+    assert store.login_user("ada", "secret")
+    assert not store.login_user("ada", "wrong")
+    assert not store.login_user("nobody", "secret")
+
+
+def test_old_hashes_are_upgraded_on_login(tmp_path):
+    path = str(tmp_path / "users.sqlite3")
+    store = SQLiteUserStore(path, iterations=1000)
+    with store.connection() as conn:
+        conn.execute("INSERT INTO users (username, password) VALUES (?, ?)", ("plain", "secret"))
+        conn.execute("INSERT INTO users (username, password) VALUES (?, ?)",
+                     ("old", hash_password("secret", iterations=500)))
+        conn.commit()
+    assert store.login_user("plain", "secret")
+    assert store.login_user("old", "secret")
+    with store.connection() as conn:
+        stored = dict(conn.execute("SELECT username, password FROM users").fetchall())
+    assert stored["plain"].startswith("pbkdf2_sha256$1000$")
+    assert stored["old"].startswith("pbkdf2_sha256$1000$")
+    assert store.login_user("plain", "secret")
+
+
+def test_duplicate_usernames_stop_the_migration(tmp_path):
+    path = str(tmp_path / "users.sqlite3")
+    conn = sqlite3.connect(path)
+    conn.execute("CREATE TABLE users (id INTEGER PRIMARY KEY AUTOINCREMENT, username TEXT NOT NULL, "
+                 "password TEXT NOT NULL)")
+    conn.executemany("INSERT INTO users (username, password) VALUES (?, ?)", [("ada", "a"), ("ada", "b")])
+    conn.commit()
+    conn.close()
+    with pytest.raises(UserStoreError, match="duplicate"):
+        SQLiteUserStore(path, iterations=1000)
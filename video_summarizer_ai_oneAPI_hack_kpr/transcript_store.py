@@ -0,0 +1,280 @@
+# transcript_store.py
+# Transcript provider for the app, the job worker and the benchmarks. Raw
+# segments (text, start, duration) are kept in a SQLite store as
+# zlib-compressed column arrays, so a video is fetched from YouTube once and
+# every later request is a local read. Every HTTP request of a network fetch
+# carries its own timeout (on the requests session handed to
+# youtube-transcript-api), so a hung connection fails in the calling thread
+# instead of being left running in the background. Transient failures are
+# retried with backoff; prefetch() pulls a list of videos concurrently under a
+# shared rate limit.
+#
+# TRANSCRIPT_FIXTURE_DIR replays transcripts from <dir>/<video_id>.json files
+# (the bench/fixtures format) with no network at all.
+#
+# Settings: TRANSCRIPT_STORE_PATH, TRANSCRIPT_TTL_SECONDS, TRANSCRIPT_FETCH_TIMEOUT,
+#           TRANSCRIPT_FETCH_RETRIES, TRANSCRIPT_PREFETCH_CONCURRENCY,
+#           TRANSCRIPT_REQUESTS_PER_SECOND, TRANSCRIPT_FIXTURE_DIR
+#
+# Usage: python transcript_store.py <video ID or link> ... [--file links.txt]
+import argparse
+import json
+import os
+import threading
+import time
+import zlib
+from concurrent.futures import ThreadPoolExecutor
+
+from summary_cache import CACHE_DIR, thread_connection
+
+TRANSCRIPT_STORE_PATH = os.environ.get("TRANSCRIPT_STORE_PATH", os.path.join(CACHE_DIR, "transcripts.sqlite3"))
+TRANSCRIPT_TTL_SECONDS = int(os.environ.get("TRANSCRIPT_TTL_SECONDS", str(30 * 24 * 3600)))
+FETCH_TIMEOUT_SECONDS = float(os.environ.get("TRANSCRIPT_FETCH_TIMEOUT", "20"))
+FETCH_RETRIES = int(os.environ.get("TRANSCRIPT_FETCH_RETRIES", "3"))
+PREFETCH_CONCURRENCY = int(os.environ.get("TRANSCRIPT_PREFETCH_CONCURRENCY", "4"))
+REQUESTS_PER_SECOND = float(os.environ.get("TRANSCRIPT_REQUESTS_PER_SECOND", "2"))
+TRANSCRIPT_FIXTURE_DIR = os.environ.get("TRANSCRIPT_FIXTURE_DIR")
+RETRY_BACKOFF_SECONDS = 1.0
+# The YouTubeTranscriptApi.get_transcript default
+TRANSCRIPT_LANGUAGES = ("en",)
+
+
+class TranscriptUnavailable(Exception):
+    pass
+
+
+# Function to make a requests session whose requests time out unless given their own timeout
+def timeout_session(timeout):
+    import requests
+
+    class TimeoutSession(requests.Session):
+        def request(self, method, url, **kwargs):
+            kwargs.setdefault("timeout", timeout)
+            return super().request(method, url, **kwargs)
+
+    return TimeoutSession()
+
+
+class FetchLimiter:
+    # Spaces network requests at least 1/rate seconds apart across threads
+    def __init__(self, rate=REQUESTS_PER_SECOND):
+        self.interval = 1.0 / rate if rate else 0.0
+        self._lock = threading.Lock()
+        self._next_start = 0.0
+
+    def wait(self):
+        with self._lock:
+            now = time.monotonic()
+            start = max(now, self._next_start)
+            self._next_start = start + self.interval
+        if start > now:
+            time.sleep(start - now)
+
+
+# Function to reduce fetched segments to text, start and duration (times to the millisecond)
+def normalize_segments(segments):
+    return [{"text": segment["text"], "start": round(float(segment["start"]), 3),
+             "duration": round(float(segment.get("duration", 0.0)), 3)} for segment in segments]
+
+
+# Function to pack segments as compressed column arrays
+def pack_segments(segments):
+    columns = {
+        "text": [segment["text"] for segment in segments],
+        "start": [segment["start"] for segment in segments],
+        "duration": [segment["duration"] for segment in segments],
+    }
+    return zlib.compress(json.dumps(columns, ensure_ascii=False, separators=(",", ":")).encode("utf-8"))
+
+
+# Function to unpack stored column arrays back into segment dicts
+def unpack_segments(blob):
+    columns = json.loads(zlib.decompress(blob).decode("utf-8"))
+    return [{"text": text, "start": start, "duration": duration}
+            for text, start, duration in zip(columns["text"], columns["start"], columns["duration"])]
+
+
+# Function to load a recorded transcript from a fixture directory
+def load_fixture(video_id, fixture_dir):
+    path = os.path.join(fixture_dir, f"{video_id}.json")
+    if not os.path.exists(path):
+        raise TranscriptUnavailable(f"No fixture for video {video_id} in {fixture_dir}")
+    with open(path, encoding="utf-8") as f:
+        data = json.load(f)
+    return data["transcript"] if isinstance(data, dict) else data
+
+
+# Function to tell transient fetch failures (worth retrying) from permanent ones
+def is_retryable(error):
+    if isinstance(error, ImportError):
+        return False
+    try:
+        from youtube_transcript_api import CouldNotRetrieveTranscript, TooManyRequests, YouTubeRequestFailed
+    except ImportError:
+        return True
+    if isinstance(error, (TooManyRequests, YouTubeRequestFailed)):
+        return True
+    # Transcripts disabled, no transcript in the language, video unavailable, ...
+    return not isinstance(error, CouldNotRetrieveTranscript)
+
+
+class TranscriptStore:
+    def __init__(self, path=TRANSCRIPT_STORE_PATH, ttl_seconds=TRANSCRIPT_TTL_SECONDS,
+                 fixture_dir=TRANSCRIPT_FIXTURE_DIR, timeout=FETCH_TIMEOUT_SECONDS, retries=FETCH_RETRIES,
+                 limiter=None):
+        self.path = path
+        self.ttl_seconds = ttl_seconds
+        self.fixture_dir = fixture_dir
+        self.timeout = timeout
+        self.retries = retries
+        self.limiter = limiter or FetchLimiter()
+        self.stats = {"store_hits": 0, "fixture_hits": 0, "network_fetches": 0, "retries": 0, "failures": 0}
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._video_locks = {}
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        with self._connection() as conn:
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS transcripts (
+                    video_id TEXT PRIMARY KEY,
+                    segments BLOB NOT NULL,
+                    fetched REAL NOT NULL
+                )
+            """)
+
+    def _connection(self):
+        return thread_connection(self._local, self.path)
+
+    def _count(self, name):
+        with self._lock:
+            self.stats[name] += 1
+
+    # One lock per video so concurrent requests for the same video share a single fetch
+    def _video_lock(self, video_id):
+        with self._lock:
+            return self._video_locks.setdefault(video_id, threading.Lock())
+
+    # Function to read a stored transcript, or None if missing or expired
+    def load(self, video_id):
+        row = self._connection().execute(
+            "SELECT segments, fetched FROM transcripts WHERE video_id = ?", (video_id,)
+        ).fetchone()
+        if row is None or (self.ttl_seconds and time.time() - row[1] > self.ttl_seconds):
+            return None
+        return unpack_segments(row[0])
+
+    def save(self, video_id, segments):
+        with self._connection() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO transcripts (video_id, segments, fetched) VALUES (?, ?, ?)",
+                (video_id, pack_segments(segments), time.time()),
+            )
+
+    def delete(self, video_id):
+        with self._connection() as conn:
+            conn.execute("DELETE FROM transcripts WHERE video_id = ?", (video_id,))
+
+    # Same steps as YouTubeTranscriptApi.get_transcript, which in 0.6.0 takes no timeout or session
+    def _fetch_once(self, video_id):
+        from youtube_transcript_api._transcripts import TranscriptListFetcher
+        self.limiter.wait()
+        self._count("network_fetches")
+        with timeout_session(self.timeout) as session:
+            transcripts = TranscriptListFetcher(session).fetch(video_id)
+            return transcripts.find_transcript(TRANSCRIPT_LANGUAGES).fetch()
+
+    # Function to fetch a transcript from YouTube, retrying transient failures with backoff
+    def fetch(self, video_id):
+        for attempt in range(self.retries + 1):
+            try:
+                return self._fetch_once(video_id)
+            except Exception as e:
+                if attempt == self.retries or not is_retryable(e):
+                    self._count("failures")
+                    raise
+                self._count("retries")
+                print(f"Error fetching transcript for {video_id} (retrying): {str(e)}")
+                time.sleep(RETRY_BACKOFF_SECONDS * 2 ** attempt)
+
+    # Function to get a video's transcript segments: fixtures, then the store, then the network
+    def get(self, video_id):
+        if self.fixture_dir:
+            segments = load_fixture(video_id, self.fixture_dir)
+            self._count("fixture_hits")
+            return segments
+        segments = self.load(video_id)
+        if segments is not None:
+            self._count("store_hits")
+            return segments
+        with self._video_lock(video_id):
+            # Another thread may have fetched it while we waited
+            segments = self.load(video_id)
+            if segments is not None:
+                self._count("store_hits")
+                return segments
+            segments = normalize_segments(self.fetch(video_id))
+            self.save(video_id, segments)
+        return segments
+
+    # Function to fetch many videos concurrently; returns {video_id: segments or the exception}
+    def prefetch(self, video_ids, concurrency=PREFETCH_CONCURRENCY):
+        def fetch_one(video_id):
+            try:
+                return video_id, self.get(video_id)
+            except Exception as e:
+                print(f"Error prefetching transcript for {video_id}: {str(e)}")
+                return video_id, e
+
+        unique_ids = list(dict.fromkeys(video_ids))
+        with ThreadPoolExecutor(max_workers=concurrency) as executor:
+            return dict(executor.map(fetch_one, unique_ids))
+
+    def entry_count(self):
+        return self._connection().execute("SELECT COUNT(*) FROM transcripts").fetchone()[0]
+
+
+_default_store = None
+_default_lock = threading.Lock()
+
+
+# Function to get the shared transcript store, created once per process
+def get_transcript_store():
+    global _default_store
+    with _default_lock:
+        if _default_store is None:
+            _default_store = TranscriptStore()
+    return _default_store
+
+
+# Function to get a video's transcript segments through the shared store
+def get_transcript(video_id):
+    return get_transcript_store().get(video_id)
+
+
+# Function to flatten transcript segments into plain text (the one place the app does this)
+def join_transcript(segments):
+    return ' '.join([t['text'] for t in segments])
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Prefetch YouTube transcripts into the local store")
+    parser.add_argument("videos", nargs="*", help="video IDs or links")
+    parser.add_argument("--file", help="file with one video ID or link per line")
+    parser.add_argument("--concurrency", type=int, default=PREFETCH_CONCURRENCY)
+    args = parser.parse_args()
+
+    videos = list(args.videos)
+    if args.file:
+        with open(args.file, encoding="utf-8") as f:
+            videos.extend(line.strip() for line in f if line.strip() and not line.startswith("#"))
+    # Accept links as well as bare IDs
+    video_ids = [video.split("v=")[1].split("&")[0] if "v=" in video else video for video in videos]
+
+    store = get_transcript_store()
+    start = time.perf_counter()
+    results = store.prefetch(video_ids, args.concurrency)
+    failed = [video_id for video_id, result in results.items() if isinstance(result, Exception)]
+    print(f"{len(results) - len(failed)}/{len(results)} transcripts available in {time.perf_counter() - start:.1f}s")
+    print(json.dumps(store.stats))
+    if failed:
+        print("Failed: " + ", ".join(failed))
@@ -0,0 +1,308 @@
+# translation.py
+# Asyncio translation layer. Text is split into sentences and each sentence
+# is cached by (normalized sentence hash, language) in a bounded in-memory LRU
+# backed by an optional SQLite tier. Only the sentences missing from the cache
+# are sent: they are packed one per line into requests the backend accepts,
+# the requests (and every target language) run concurrently under a shared
+# rate limit, and the sentences are put back together in their original
+# order with the whitespace and line breaks that separated them. Sentences end
+# at .!?… followed by whitespace (not before a lowercase word) or at a line
+# break, so decimals, domains and "U.S. economy" stay whole. Streamlit reruns, and texts that share most of their sentences with
+# an earlier one, only pay for what is new.
+#
+# TRANSLATOR_BACKEND=stub swaps googletrans for a local stand-in, for tests and
+# offline runs.
+import asyncio
+import hashlib
+import json
+import os
+import re
+import threading
+import time
+from collections import OrderedDict
+
+from summary_cache import DiskLRUCache, normalize_text, text_hash
+
+# googletrans rejects requests over 5000 characters
+MAX_SEGMENT_CHARS = 4500
+MAX_CONCURRENT_REQUESTS = int(os.environ.get("TRANSLATOR_MAX_CONCURRENCY", "4"))
+REQUESTS_PER_SECOND = float(os.environ.get("TRANSLATOR_REQUESTS_PER_SECOND", "5"))
+TRANSLATION_CACHE_SIZE = int(os.environ.get("TRANSLATION_CACHE_SIZE", "2000"))
+TRANSLATION_DISK_MAX_ENTRIES = int(os.environ.get("TRANSLATION_DISK_MAX_ENTRIES", "20000"))
+TRANSLATION_CACHE_DISK = os.environ.get("TRANSLATION_CACHE_DISK", "1") == "1"
+SLOT_POLL_SECONDS = 0.01
+
+# Whitespace between sentences: line breaks, after sentence-ending punctuation, and at either end
+_SEPARATOR_RE = re.compile(r'(^\s+|\s*\n\s*|(?<=[.!?…])\s+(?=[^\sa-z])|(?<=[。！？])\s*(?=\S)|\s+$)')
+
+
+class GoogleTranslateBackend:
+    def __init__(self):
+        # googletrans' Translator keeps an HTTP client, so each worker thread gets its own
+        self._local = threading.local()
+
+    def _translator(self):
+        translator = getattr(self._local, "translator", None)
+        if translator is None:
+            from googletrans import Translator
+            translator = self._local.translator = Translator()
+        return translator
+
+    async def translate(self, text, dest):
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(
+            None, lambda: self._translator().translate(text, dest=dest).text
+        )
+
+
+class StubTranslateBackend:
+    # Local stand-in: tags the text with the language after an optional simulated delay
+    def __init__(self, delay=0.0):
+        self.delay = delay
+        self.calls = 0
+
+    async def translate(self, text, dest):
+        self.calls += 1
+        if self.delay:
+            await asyncio.sleep(self.delay)
+        return "\n".join(f"[{dest}] {line}" for line in text.split("\n"))
+
+
+class RateLimiter:
+    # Caps in-flight requests and spaces request starts at least 1/rate seconds apart.
+    # Built on threading primitives only, so one instance is shared by every Streamlit
+    # session and by the separate event loop each asyncio.run() call creates.
+    def __init__(self, max_concurrency=MAX_CONCURRENT_REQUESTS, rate=REQUESTS_PER_SECOND):
+        self.max_concurrency = max_concurrency
+        self.interval = 1.0 / rate if rate else 0.0
+        self._slots = threading.BoundedSemaphore(max_concurrency)
+        self._lock = threading.Lock()
+        self._next_start = 0.0
+
+    async def __aenter__(self):
+        # Poll for a slot instead of blocking, which would stall this thread's event loop
+        while not self._slots.acquire(blocking=False):
+            await asyncio.sleep(SLOT_POLL_SECONDS)
+        try:
+            with self._lock:
+                now = time.monotonic()
+                wait = self._next_start - now
+                self._next_start = max(now, self._next_start) + self.interval
+            if wait > 0:
+                await asyncio.sleep(wait)
+        except BaseException:
+            # Cancelled while waiting for its start time
+            self._slots.release()
+            raise
+        return self
+
+    async def __aexit__(self, *exc):
+        self._slots.release()
+
+
+# Process-wide limiter used by every translation call unless one is passed in
+rate_limiter = RateLimiter()
+
+
+# Function to build the cache key for one translated sentence
+def translation_key(sentence, lang):
+    parts = [text_hash(normalize_text(sentence)), lang]
+    return hashlib.sha256(json.dumps(parts).encode("utf-8")).hexdigest()
+
+
+class TranslationCache:
+    # In-memory LRU in front of an optional DiskLRUCache; disk hits are promoted to memory
+    def __init__(self, max_entries=TRANSLATION_CACHE_SIZE, disk=None):
+        self.max_entries = max_entries
+        self.disk = disk
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _remember(self, key, value):
+        with self._lock:
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def get(self, sentence, lang):
+        key = translation_key(sentence, lang)
+        with self._lock:
+            value = self._entries.get(key)
+            if value is not None:
+                self._entries.move_to_end(key)
+                self.memory_hits += 1
+                return value
+        value = self.disk.get(key) if self.disk is not None else None
+        with self._lock:
+            if value is None:
+                self.misses += 1
+                return None
+            self.disk_hits += 1
+        self._remember(key, value)
+        return value
+
+    def put(self, sentence, lang, value):
+        key = translation_key(sentence, lang)
+        self._remember(key, value)
+        if self.disk is not None:
+            self.disk.put(key, value)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+        if self.disk is not None:
+            self.disk.clear()
+
+    def stats(self):
+        lookups = self.memory_hits + self.disk_hits + self.misses
+        hits = self.memory_hits + self.disk_hits
+        return {
+            "entries": len(self._entries),
+            "memory_hits": self.memory_hits,
+            "disk_hits": self.disk_hits,
+            "misses": self.misses,
+            "hit_rate": round(hits / lookups, 3) if lookups else 0.0,
+        }
+
+
+# Shared cache of translated sentences
+translation_cache = TranslationCache(
+    disk=DiskLRUCache(table="translations", max_entries=TRANSLATION_DISK_MAX_ENTRIES)
+    if TRANSLATION_CACHE_DISK else None
+)
+
+_backend = None
+
+
+# Function to get the configured translation backend
+def get_backend():
+    global _backend
+    if _backend is None:
+        if os.environ.get("TRANSLATOR_BACKEND", "google") == "stub":
+            _backend = StubTranslateBackend()
+        else:
+            _backend = GoogleTranslateBackend()
+    return _backend
+
+
+# Function to split text into (sentence, separator) pairs of at most max_chars (longer ones are cut
+# on word boundaries); joining every sentence and separator gives back the text
+def split_sentences(text, max_chars=MAX_SEGMENT_CHARS):
+    pieces = _SEPARATOR_RE.split(text)
+    sentences = []
+    # re.split alternates the text between separators with the separators themselves
+    for i in range(0, len(pieces), 2):
+        sentence = pieces[i]
+        separator = pieces[i + 1] if i + 1 < len(pieces) else ""
+        while len(sentence) > max_chars:
+            cut = sentence.rfind(" ", 0, max_chars)
+            if cut > 0:
+                sentences.append((sentence[:cut], " "))
+                sentence = sentence[cut + 1:]
+            else:
+                sentences.append((sentence[:max_chars], ""))
+                sentence = sentence[max_chars:]
+        if sentence or separator:
+            sentences.append((sentence, separator))
+    return sentences
+
+
+# Function to pack sentences into requests of at most max_chars, one sentence per line
+def pack_requests(sentences, max_chars=MAX_SEGMENT_CHARS):
+    requests = []
+    current, size = [], 0
+    for sentence in sentences:
+        added = len(sentence) + (1 if current else 0)
+        if current and size + added > max_chars:
+            requests.append(current)
+            current, size, added = [], 0, len(sentence)
+        current.append(sentence)
+        size += added
+    if current:
+        requests.append(current)
+    return requests
+
+
+# Function to translate one packed request, returning one translation per sentence
+async def _translate_request(sentences, dest, backend, limiter):
+    async with limiter:
+        translated = await backend.translate("\n".join(sentences), dest)
+    if len(sentences) == 1:
+        return [" ".join(translated.split("\n")).strip()]
+    lines = [line.strip() for line in translated.split("\n") if line.strip()]
+    if len(lines) == len(sentences):
+        return lines
+    # The backend merged or split lines, so the pieces can't be matched to sentences; go one by one
+    results = await asyncio.gather(*(_translate_request([sentence], dest, backend, limiter) for sentence in sentences))
+    return [result[0] for result in results]
+
+
+# Function to translate text into one language; cached sentences are reused, the rest sent in parallel requests
+async def translate_async(text, dest, backend=None, limiter=None, cache=translation_cache):
+    backend = backend or get_backend()
+    limiter = limiter or rate_limiter
+    sentences = split_sentences(text)
+    # Empty pieces (e.g. leading whitespace) translate to themselves
+    translations = {"": ""}
+    misses = []
+    for sentence in dict.fromkeys(sentence for sentence, _ in sentences if sentence):
+        cached = cache.get(sentence, dest) if cache is not None else None
+        if cached is not None:
+            translations[sentence] = cached
+        else:
+            misses.append(sentence)
+
+    requests = pack_requests(misses)
+    results = await asyncio.gather(*(_translate_request(request, dest, backend, limiter) for request in requests))
+    for request, translated in zip(requests, results):
+        for sentence, value in zip(request, translated):
+            translations[sentence] = value
+            if cache is not None:
+                cache.put(sentence, dest, value)
+    return ''.join(translations[sentence] + separator for sentence, separator in sentences)
+
+
+# Function to translate text into several languages at once: {lang: translated text}
+async def translate_many_async(text, dests, backend=None, limiter=None, cache=translation_cache):
+    backend = backend or get_backend()
+    limiter = limiter or rate_limiter
+    results = await asyncio.gather(
+        *(translate_async(text, dest, backend, limiter, cache) for dest in dests)
+    )
+    return dict(zip(dests, results))
+
+
+# Function to run a coroutine from synchronous code (e.g. a Streamlit script)
+def _run(coroutine):
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        return asyncio.run(coroutine)
+    # Already inside an event loop: run on a separate thread with its own loop
+    result = {}
+
+    def runner():
+        result["value"] = asyncio.run(coroutine)
+
+    thread = threading.Thread(target=runner)
+    thread.start()
+    thread.join()
+    return result["value"]
+
+
+# Function to translate text
+def translate_text(text, lang, backend=None, cache=translation_cache):
+    if not text or not text.strip():
+        return text
+    return _run(translate_async(text, lang, backend, cache=cache))
+
+
+# Function to translate text into several languages concurrently
+def translate_many(text, langs, backend=None, cache=translation_cache):
+    if not text or not text.strip():
+        return {lang: text for lang in langs}
+    return _run(translate_many_async(text, list(langs), backend, cache=cache))
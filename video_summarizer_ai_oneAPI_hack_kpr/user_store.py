@@ -0,0 +1,233 @@
+# user_store.py
+# User accounts for the app. Connections come from a pool (MySQL) or are kept
+# one per thread (SQLite in WAL mode, the local stand-in), the username column
+# has a unique index, and passwords are stored as salted PBKDF2 hashes.
+#
+# PASSWORD_HASH_ITERATIONS tunes the hashing cost. Accounts hashed with a
+# different cost, and accounts still holding a plaintext password from before
+# hashing, are re-hashed on their next successful login. Hashing never runs
+# while a connection is held, so slow hashes don't starve the pool; when all
+# pooled connections are busy, callers wait up to USER_DB_POOL_TIMEOUT seconds
+# and then get UserStoreBusy.
+#
+# Settings: USER_STORE_BACKEND=mysql|sqlite, USER_DB_HOST / USER_DB_USER /
+#           USER_DB_PASSWORD / USER_DB_NAME, USER_DB_POOL_SIZE, USER_DB_POOL_TIMEOUT,
+#           USER_DB_PATH
+import base64
+import hashlib
+import hmac
+import os
+import secrets
+import sqlite3
+import threading
+from contextlib import contextmanager
+
+from summary_cache import CACHE_DIR, thread_connection
+
+USER_STORE_BACKEND = os.environ.get("USER_STORE_BACKEND", "mysql")
+USER_DB_HOST = os.environ.get("USER_DB_HOST", "localhost")
+USER_DB_USER = os.environ.get("USER_DB_USER", "root")
+USER_DB_PASSWORD = os.environ.get("USER_DB_PASSWORD", "")
+USER_DB_NAME = os.environ.get("USER_DB_NAME", "test")
+USER_DB_POOL_SIZE = int(os.environ.get("USER_DB_POOL_SIZE", "5"))
+USER_DB_POOL_TIMEOUT = float(os.environ.get("USER_DB_POOL_TIMEOUT", "10"))
+USER_DB_PATH = os.environ.get("USER_DB_PATH", os.path.join(CACHE_DIR, "users.sqlite3"))
+PASSWORD_HASH_ITERATIONS = int(os.environ.get("PASSWORD_HASH_ITERATIONS", "200000"))
+HASH_PREFIX = "pbkdf2_sha256"
+
+
+DUPLICATE_USERNAMES_MESSAGE = (
+    "users.username has duplicate values, so its unique index can't be created. Find them with "
+    "SELECT username, COUNT(*) FROM users GROUP BY username HAVING COUNT(*) > 1, "
+    "remove or rename the duplicates and restart."
+)
+
+
+class UserStoreError(Exception):
+    pass
+
+
+# Raised when no pooled connection frees up within the pool timeout
+class UserStoreBusy(UserStoreError):
+    pass
+
+
+# Function to hash a password as "pbkdf2_sha256$iterations$salt$hash"
+def hash_password(password, iterations=PASSWORD_HASH_ITERATIONS, salt=None):
+    salt = salt or secrets.token_bytes(16)
+    digest = hashlib.pbkdf2_hmac("sha256", password.encode("utf-8"), salt, iterations)
+    return "$".join([HASH_PREFIX, str(iterations), base64.b64encode(salt).decode("ascii"),
+                     base64.b64encode(digest).decode("ascii")])
+
+
+# Function to check a password against a stored value; returns (matches, needs_rehash)
+def verify_password(password, stored, iterations=PASSWORD_HASH_ITERATIONS):
+    parts = stored.split("$")
+    if len(parts) != 4 or parts[0] != HASH_PREFIX:
+        # Plaintext from before passwords were hashed
+        return hmac.compare_digest(password.encode("utf-8"), stored.encode("utf-8")), True
+    stored_iterations, salt = int(parts[1]), base64.b64decode(parts[2])
+    expected = hash_password(password, stored_iterations, salt)
+    return hmac.compare_digest(expected, stored), stored_iterations != iterations
+
+
+# Shared SQL for the backends; each subclass provides connection() as a context manager
+class UserStore:
+    placeholder = "%s"
+    integrity_errors = ()
+
+    def __init__(self, iterations=PASSWORD_HASH_ITERATIONS):
+        self.iterations = iterations
+
+    def _sql(self, statement):
+        return statement.replace("?", self.placeholder)
+
+    # Function to register a new user; returns False if the username is taken
+    def register_user(self, username, password):
+        if not username or not password:
+            return False
+        password_hash = hash_password(password, self.iterations)
+        with self.connection() as conn:
+            cursor = conn.cursor()
+            try:
+                cursor.execute(self._sql("INSERT INTO users (username, password) VALUES (?, ?)"),
+                               (username, password_hash))
+                conn.commit()
+                return True
+            except self.integrity_errors:
+                # Release the failed insert's transaction (and its write lock)
+                conn.rollback()
+                return False
+            finally:
+                cursor.close()
+
+    # Function to check a user's credentials, upgrading old or plaintext hashes on success
+    def login_user(self, username, password):
+        # The connection goes back to the pool before any hashing
+        with self.connection() as conn:
+            cursor = conn.cursor()
+            try:
+                cursor.execute(self._sql("SELECT id, password FROM users WHERE username = ?"), (username,))
+                # fetchall, not fetchone: MySQL cursors refuse the next statement while rows are unread
+                rows = cursor.fetchall()
+            finally:
+                cursor.close()
+        row = rows[0] if rows else None
+        if row is None:
+            # Hash anyway so unknown usernames take as long as wrong passwords
+            hash_password(password, self.iterations)
+            return False
+        matches, needs_rehash = verify_password(password, row[1], self.iterations)
+        if matches and needs_rehash:
+            password_hash = hash_password(password, self.iterations)
+            with self.connection() as conn:
+                cursor = conn.cursor()
+                try:
+                    # Only if unchanged since it was read, so a password set in between isn't overwritten
+                    cursor.execute(self._sql("UPDATE users SET password = ? WHERE id = ? AND password = ?"),
+                                   (password_hash, row[0], row[1]))
+                    conn.commit()
+                finally:
+                    cursor.close()
+        return matches
+
+
+class MySQLUserStore(UserStore):
+    def __init__(self, host=USER_DB_HOST, user=USER_DB_USER, password=USER_DB_PASSWORD,
+                 database=USER_DB_NAME, pool_size=USER_DB_POOL_SIZE, pool_timeout=USER_DB_POOL_TIMEOUT,
+                 iterations=PASSWORD_HASH_ITERATIONS):
+        super().__init__(iterations)
+        import mysql.connector
+        from mysql.connector import pooling
+        self.integrity_errors = (mysql.connector.IntegrityError,)
+        # get_connection() fails at once on an empty pool, so callers queue here for a free connection
+        self.pool_timeout = pool_timeout
+        self._slots = threading.BoundedSemaphore(pool_size)
+        self._pool = pooling.MySQLConnectionPool(
+            pool_name="users", pool_size=pool_size, pool_reset_session=False,
+            host=host, user=user, password=password, database=database
+        )
+        self._create_schema(mysql.connector)
+
+    # Borrowed connections go back to the pool on close() instead of being torn down
+    @contextmanager
+    def connection(self):
+        if not self._slots.acquire(timeout=self.pool_timeout):
+            raise UserStoreBusy(f"No database connection free after {self.pool_timeout}s")
+        try:
+            conn = self._pool.get_connection()
+            try:
+                yield conn
+            finally:
+                conn.close()
+        finally:
+            self._slots.release()
+
+    def _create_schema(self, connector):
+        with self.connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute("""
+                CREATE TABLE IF NOT EXISTS users (
+                    id INT AUTO_INCREMENT PRIMARY KEY,
+                    username VARCHAR(50) NOT NULL,
+                    password VARCHAR(255) NOT NULL,
+                    UNIQUE KEY users_username (username)
+                )
+            """)
+            # Tables created before the index existed
+            try:
+                cursor.execute("CREATE UNIQUE INDEX users_username ON users (username)")
+            except connector.Error as e:
+                # 1061: the index already exists
+                # Without the index register_user can't tell a taken username, so don't start without it
+                if e.errno == 1062:
+                    raise UserStoreError(DUPLICATE_USERNAMES_MESSAGE) from e
+                if e.errno != 1061:
+                    raise UserStoreError(f"Could not create the unique index on users.username: {str(e)}") from e
+            finally:
+                conn.commit()
+                cursor.close()
+
+
+class SQLiteUserStore(UserStore):
+    placeholder = "?"
+    integrity_errors = (sqlite3.IntegrityError,)
+
+    def __init__(self, path=USER_DB_PATH, iterations=PASSWORD_HASH_ITERATIONS):
+        super().__init__(iterations)
+        self.path = path
+        self._local = threading.local()
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        with self.connection() as conn:
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS users (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    username TEXT NOT NULL,
+                    password TEXT NOT NULL
+                )
+            """)
+            try:
+                conn.execute("CREATE UNIQUE INDEX IF NOT EXISTS users_username ON users (username)")
+            except sqlite3.IntegrityError as e:
+                raise UserStoreError(DUPLICATE_USERNAMES_MESSAGE) from e
+            conn.commit()
+
+    @contextmanager
+    def connection(self):
+        yield thread_connection(self._local, self.path)
+
+
+_default_store = None
+_default_lock = threading.Lock()
+
+
+# Function to get the shared user store, created once per process
+def get_user_store():
+    global _default_store
+    with _default_lock:
+        if _default_store is None:
+            if USER_STORE_BACKEND == "sqlite":
+                _default_store = SQLiteUserStore()
+            else:
+                _default_store = MySQLUserStore()
+    return _default_store
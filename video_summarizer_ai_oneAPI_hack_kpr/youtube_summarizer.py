@@ -1,22 +1,30 @@
 # youtube_summarizer.py
 import http.client
-from youtube_transcript_api import YouTubeTranscriptApi
-from transformers import pipeline
 from fpdf import FPDF
 import pyttsx3
-import torch
-from concurrent.futures import ThreadPoolExecutor
+from model_registry import DEFAULT_MODEL, cache_model_name, get_summarizer
+from batch_summarizer import (
+    DEFAULT_BATCH_SIZE, SUMMARY_MAX_LENGTH, SUMMARY_MIN_LENGTH, backend_of, model_name_of
+)
+from hierarchical_summarizer import SUMMARY_TARGET_TOKENS, summarize_hierarchical
+from chapters import add_chapters_to_pdf, get_chapters
+from chunker import chunk_text
+from summary_cache import chunk_cache, chunk_key, summary_cache, summary_key
+from transcript_store import get_transcript, join_transcript
 
-# Initialize text-to-speech engine
-tts_engine = pyttsx3.init()
+# Text-to-speech engine, initialized on first use so headless runs (workers, benchmarks) don't need audio
+tts_engine = None
 
-# Initialize summarizer with specific model and device
-device = "cuda" if torch.cuda.is_available() else "cpu"
-summarizer = pipeline(
-    "summarization",
-    model="facebook/bart-large-cnn",  # Using a faster model
-    device=device  # Use GPU if available
-)
+# Summarizer with specific model, device and backend, loaded on first use (shared through the
+# model registry) so processes that only parse links or hand videos to workers don't hold a copy
+summarizer = None
+
+# Function to get the summarizer, loading it on first use
+def get_default_summarizer():
+    global summarizer
+    if summarizer is None:
+        summarizer = get_summarizer(DEFAULT_MODEL)
+    return summarizer
 
 # Function to extract video ID from link
 def extract_video_id(link):
@@ -29,55 +37,43 @@ def extract_video_id(link):
         print(f"Error extracting video ID: {str(e)}")
         return None
 
-# Function to chunk text into smaller pieces
-def chunk_text(text, max_length=1024):
-    # Optimize chunking for better summary quality
-    sentences = text.split('. ')
-    current_chunk = []
-    current_length = 0
-    
-    for sentence in sentences:
-        words = sentence.split()
-        if current_length + len(words) <= max_length:
-            current_chunk.append(sentence)
-            current_length += len(words)
-        else:
-            yield '. '.join(current_chunk) + '.'
-            current_chunk = [sentence]
-            current_length = len(words)
-    
-    if current_chunk:
-        yield '. '.join(current_chunk) + '.'
-
-# Function to summarize chunk
+# Function to summarize chunk (memoized by normalized chunk text and generation settings)
 def summarize_chunk(chunk):
+    summarizer = get_default_summarizer()
+    model_name = cache_model_name(model_name_of(summarizer), backend_of(summarizer))
+    cache_key = chunk_key(chunk, model_name, SUMMARY_MAX_LENGTH, SUMMARY_MIN_LENGTH)
+    cached = chunk_cache.get(cache_key)
+    if cached is not None:
+        return cached
     try:
-        return summarizer(
+        summary = summarizer(
             chunk,
-            max_length=150,
-            min_length=50,
+            max_length=SUMMARY_MAX_LENGTH,
+            min_length=SUMMARY_MIN_LENGTH,
             do_sample=False,
             truncation=True
         )[0]['summary_text']
+        chunk_cache.put(cache_key, summary)
+        return summary
     except Exception as e:
         print(f"Error summarizing chunk: {str(e)}")
         return ""
 
 # Function to summarize video transcript
-def summarize_transcript(transcript_text):
-    # Optimize chunk size and parallel processing
-    chunks = list(chunk_text(transcript_text, max_length=500))
-    
-    # Use ThreadPoolExecutor for parallel processing
-    with ThreadPoolExecutor(max_workers=min(len(chunks), 4)) as executor:
-        summaries = list(executor.map(summarize_chunk, chunks))
-    
-    # Join summaries intelligently
-    final_summary = ' '.join(summary for summary in summaries if summary)
-    return final_summary
+def summarize_transcript(transcript_text, batch_size=DEFAULT_BATCH_SIZE,
+                         max_length=SUMMARY_MAX_LENGTH, min_length=SUMMARY_MIN_LENGTH, stats=None,
+                         target_tokens=SUMMARY_TARGET_TOKENS):
+    # Stream token-budgeted chunks through the batched summarizer, then reduce the
+    # chunk summaries until the final summary fits target_tokens
+    summarizer = get_default_summarizer()
+    chunks = chunk_text(transcript_text, tokenizer=summarizer.tokenizer)
+    return summarize_hierarchical(
+        chunks, summarizer, target_tokens=target_tokens, batch_size=batch_size,
+        max_length=max_length, min_length=min_length, stats=stats
+    )
 
-# Function to generate PDF
-def generate_pdf(summary_text):
+# Function to generate PDF, with timestamp-linked chapters when given
+def generate_pdf(summary_text, chapters=None, video_id=None):
     pdf = FPDF()
     pdf.add_page()
     pdf.set_font("Arial", size=12)
@@ -88,6 +84,9 @@ def generate_pdf(summary_text):
         pdf.multi_cell(0, 10, summary_text.encode('latin-1', 'replace').decode('latin-1'))
     except Exception:
         pdf.multi_cell(0, 10, summary_text.encode('latin-1', 'ignore').decode('latin-1'))
+
+    if chapters and video_id:
+        add_chapters_to_pdf(pdf, video_id, chapters)
     
     pdf_file = "summary.pdf"
     pdf.output(pdf_file)
@@ -95,6 +94,9 @@ def generate_pdf(summary_text):
 
 # Function to speak text
 def speak_text(text):
+    global tts_engine
+    if tts_engine is None:
+        tts_engine = pyttsx3.init()
     tts_engine.setProperty('rate', 150)
     tts_engine.setProperty('voice', tts_engine.getProperty('voices')[0].id)  # Set default voice
     
@@ -105,26 +107,38 @@ def speak_text(text):
             tts_engine.say(sentence.strip())
             tts_engine.runAndWait()
 
-# Cache for storing recent summaries
-summary_cache = {}
-
-def get_video_summary(video_id):
-    # Check cache first
-    if video_id in summary_cache:
-        return summary_cache[video_id]
-    
+def get_video_summary(video_id, max_length=SUMMARY_MAX_LENGTH, min_length=SUMMARY_MIN_LENGTH, stats=None):
     try:
-        # Get video transcript
-        transcript = YouTubeTranscriptApi.get_transcript(video_id)
-        transcript_text = ' '.join([t['text'] for t in transcript])
+        # Get video transcript (stored locally after the first fetch, see transcript_store.py)
+        transcript = get_transcript(video_id)
+        transcript_text = join_transcript(transcript)
+
+        # Check the persistent cache (keyed on transcript content and generation settings)
+        cache_key = summary_key(video_id, transcript_text, cache_model_name(), max_length, min_length)
+        summary = summary_cache.get(cache_key)
+        if summary is not None:
+            if stats is not None:
+                stats["cached"] = True
+            return summary
         
         # Generate summary
-        summary = summarize_transcript(transcript_text)
+        summary = summarize_transcript(transcript_text, max_length=max_length, min_length=min_length, stats=stats)
         
         # Cache the result
-        summary_cache[video_id] = summary
+        if summary:
+            summary_cache.put(cache_key, summary)
         
         return summary
     except Exception as e:
         print(f"Error in get_video_summary: {str(e)}")
         return None
+
+# Function to get a video's chapters: one timestamped summary per transcript chunk
+def get_video_chapters(video_id, max_length=SUMMARY_MAX_LENGTH, min_length=SUMMARY_MIN_LENGTH):
+    try:
+        transcript = get_transcript(video_id)
+        return get_chapters(video_id, transcript, summarizer=get_default_summarizer(),
+                            max_length=max_length, min_length=min_length)
+    except Exception as e:
+        print(f"Error in get_video_chapters: {str(e)}")
+        return []